@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+# --- Моделі Pydantic ---
+class Photo(BaseModel):
+    """Модель даних для фотографії."""
+    id: int
+    path: str
+    filename: str
+    date_taken: str  # Формат ISO (YYYY-MM-DD HH:MM:SS)
+    location: Optional[str] = None
+    camera_model: Optional[str] = None
+    tags: List[str] = []  # Список тегів
+
+class PhotoFilter(BaseModel):
+    """Модель для параметрів фільтрації фотографій."""
+    date_from: Optional[str] = None  # YYYY-MM-DD
+    date_to: Optional[str] = None    # YYYY-MM-DD
+    tags: Optional[List[str]] = None
+    location: Optional[str] = None
+    camera_model: Optional[str] = None
+
+class TagUpdate(BaseModel):
+    """Модель для оновлення/додавання/видалення тегів."""
+    add_tags: Optional[List[str]] = None
+    remove_tags: Optional[List[str]] = None
+
+class CloudSyncRequest(BaseModel):
+    """Модель для запиту синхронізації з хмарним сховищем."""
+    service: str  # Наприклад, "google_drive", "dropbox"
+    # У реальній реалізації тут можуть бути додаткові поля, такі як облікові дані, ID папки тощо.
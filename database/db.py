@@ -1,64 +1,411 @@
+import json
+import os
+import queue
 import sqlite3
-from typing import List, Dict, Optional, Tuple, Any
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, Any, Iterator
+
+# PRAGMA, що виконуються один раз після підключення.
+# busy_timeout змушує SQLite чекати на блокування замість негайної помилки SQLITE_BUSY,
+# кеш сторінок живе разом із з'єднанням, а foreign_keys вмикає ON DELETE CASCADE для image_tags.
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA foreign_keys=ON',
+)
+
+# PRAGMA для з'єднань пулу читачів. journal_mode, synchronous та foreign_keys стосуються запису,
+# тож для з'єднань лише для читання вони не потрібні.
+READER_PRAGMAS = (
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA temp_store=MEMORY',
+)
+
+# Кількість з'єднань лише для читання у пулі читачів DatabaseManager
+READER_POOL_SIZE = os.cpu_count() or 1
+
+# Максимальна кількість ідентифікаторів в одному виразі IN (...), щоб не перевищити ліміт параметрів SQLite
+IN_QUERY_CHUNK_SIZE = 500
+
+# Мінімальна довжина підрядка назви камери/місця, для якої пошук іде через FTS5-індекс trigram;
+# коротші підрядки індекс не покриває, тож для них виконується звичайний LIKE
+FTS_MIN_PATTERN_LENGTH = 3
+
+def _substring_mode(value: Optional[str]) -> Optional[str]:
+    """
+    Визначає спосіб пошуку за підрядком: 'fts' через cameras_fts/locations_fts, 'scan' звичайним LIKE
+    для підрядків, коротших за FTS_MIN_PATTERN_LENGTH, або None, якщо фільтр не задано.
+    """
+    if not value:
+        return None
+    return 'fts' if len(value) >= FTS_MIN_PATTERN_LENGTH else 'scan'
+
+# Стовпці зображення з назвами камери та місця з довідників cameras/locations,
+# під тими самими іменами, що й до нормалізації
+IMAGE_COLUMNS = 'i.id, i.file_path, i.capture_date, c.name AS camera_model, l.name AS location, i.latitude, i.longitude'
+IMAGES_WITH_NAMES = ('images i'
+                     ' LEFT JOIN cameras c ON c.id = i.camera_id'
+                     ' LEFT JOIN locations l ON l.id = i.location_id')
+
+@lru_cache(maxsize=64)
+def _images_query(has_start: bool, has_end: bool, camera_mode: Optional[str],
+                  location_mode: Optional[str], has_tags: bool) -> str:
+    """
+    Повертає один запит до images, що поєднує фільтри за датами, за підрядками моделі камери
+    та місця і за тегами (зображення має мати УСІ теги). Текст кешується для кожного набору
+    активних фільтрів, тож SQLite повторно використовує підготовлений вираз.
+    """
+    query = f'''
+        SELECT {IMAGE_COLUMNS}
+        FROM {IMAGES_WITH_NAMES}'''
+    if has_tags:
+        query += ' JOIN image_tags it ON it.image_id = i.id JOIN tags t ON t.id = it.tag_id'
+    query += ' WHERE 1=1'
+    if has_start:
+        query += ' AND i.capture_date >= :start_date'
+    if has_end:
+        query += ' AND i.capture_date <= :end_date'
+    # LIKE перебирає лише невеликий довідник, а images фільтрується за індексованим ключем
+    for key, table, param, mode in (('camera_id', 'cameras', 'camera_model', camera_mode),
+                                    ('location_id', 'locations', 'location', location_mode)):
+        if mode == 'fts':
+            query += f' AND i.{key} IN (SELECT rowid FROM {table}_fts WHERE name LIKE :{param})'
+        elif mode == 'scan':
+            query += f' AND i.{key} IN (SELECT id FROM {table} WHERE name LIKE :{param})'
+    if has_tags:
+        query += '''
+            AND t.name IN (SELECT value FROM json_each(:tags))
+            GROUP BY i.id
+            HAVING COUNT(DISTINCT t.id) = :tag_count'''
+    return query
+
+def _images_query_params(start_date: Optional[str], end_date: Optional[str], camera_model: Optional[str],
+                         location: Optional[str], tag_names: Optional[List[str]]) -> Tuple[str, Dict[str, Any]]:
+    """Повертає текст запиту _images_query та його іменовані параметри для заданих фільтрів."""
+    tag_names = list(dict.fromkeys(tag_names or []))  # Повтори зламали б умову HAVING COUNT
+    query = _images_query(bool(start_date), bool(end_date), _substring_mode(camera_model),
+                          _substring_mode(location), bool(tag_names))
+    params = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'camera_model': f'%{camera_model}%',
+        'location': f'%{location}%',
+        'tags': json.dumps(tag_names),
+        'tag_count': len(tag_names),
+    }
+    return query, params
+
+def _locked(method):
+    """
+    Серіалізує виклики методу DatabaseManager, що використовують з'єднання для запису:
+    один екземпляр зі спільними з'єднанням і курсором може використовуватися з різних потоків
+    (наприклад, в API). Читання через _read_connection це блокування не бере.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class DatabaseManager:
-    def __init__(self, db_path: str = 'photo_ai_navigator.db'):
+    def __init__(self, db_path: str = 'photo_ai_navigator.db', reader_pool_size: int = READER_POOL_SIZE):
         """
         Ініціалізує DatabaseManager, підключається до бази даних SQLite
         та створює необхідні таблиці, якщо вони не існують.
 
         Args:
             db_path (str): Шлях до файлу бази даних SQLite.
+            reader_pool_size (int): Кількість з'єднань лише для читання для search_images,
+                                    iter_images та get_tags_for_images; 0 - читати через з'єднання для запису.
         """
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self._lock = threading.RLock()
+        self._readers = None
+        self._reader_uri = None
+        self._reader_pool_size = reader_pool_size
         self._connect()
         self._create_tables()
+        self._open_readers(reader_pool_size)
 
     def _connect(self):
-        """Встановлює з'єднання з базою даних SQLite."""
+        """
+        Встановлює з'єднання з базою даних SQLite в режимі автокомміту (isolation_level=None):
+        транзакції запису відкриваються явно через _write_transaction.
+        check_same_thread=False дозволяє використовувати з'єднання з інших потоків;
+        доступ до нього серіалізується через _locked.
+        """
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row  # Доступ до стовпців за іменем без ручного zip з cursor.description
             self.cursor = self.conn.cursor()
+            for pragma in SQLITE_PRAGMAS:
+                self.cursor.execute(pragma)
         except sqlite3.Error as e:
             print(f"Помилка підключення до бази даних: {e}")
             # У реальному застосунку можна було б викликати виняток або логувати більш детально.
 
+    def _connect_reader(self) -> sqlite3.Connection:
+        """Відкриває з'єднання лише для читання (mode=ro) з PRAGMA з READER_PRAGMAS."""
+        conn = sqlite3.connect(self._reader_uri, uri=True, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in READER_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _open_readers(self, size: int):
+        """
+        Відкриває пул з'єднань лише для читання. У режимі WAL читачі не блокують
+        один одного та записувача, тож запити на читання з різних потоків виконуються паралельно,
+        а єдине з'єднання для запису лишається за _lock. Якщо пул відкрити не вдалося
+        (наприклад, для бази в пам'яті), читання виконується через з'єднання для запису.
+        """
+        if size <= 0 or self.conn is None:
+            return
+        readers = queue.LifoQueue()
+        try:
+            self._reader_uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+            for _ in range(size):
+                readers.put(self._connect_reader())
+        except (sqlite3.Error, ValueError):
+            while not readers.empty():
+                readers.get_nowait().close()
+            return
+        self._readers = readers
+
+    @contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Бере з'єднання з пулу читачів на час блоку і повертає його після.
+        Якщо всі з'єднання зайняті (наприклад, потоком iter_images, що читає теги через
+        get_tags_for_images), відкривається додаткове, яке закривається, коли пул уже повний:
+        очікування на пул могло б заблокувати такі вкладені читання назавжди.
+        Без пулу видає з'єднання для запису під блокуванням _lock.
+        """
+        readers = self._readers
+        if readers is None:
+            with self._lock:
+                yield self.conn
+            return
+        try:
+            conn = readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect_reader()
+        try:
+            yield conn
+        finally:
+            if self._readers is readers and readers.qsize() < self._reader_pool_size:
+                readers.put(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def _write_transaction(self):
+        """
+        Виконує блок як транзакцію запису. BEGIN IMMEDIATE одразу бере блокування запису,
+        тож транзакція не завершиться помилкою SQLITE_BUSY при спробі оновитися з читання до запису.
+        У разі винятку зміни відкочуються.
+        """
+        self.cursor.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.cursor.execute('ROLLBACK')
+            raise
+        self.cursor.execute('COMMIT')
+
     def _create_tables(self):
-        """Створює таблиці 'images', 'tags' та 'image_tags', якщо вони ще не існують."""
+        """
+        Створює таблиці 'images', 'cameras', 'locations', 'tags' та 'image_tags', їхні індекси
+        та FTS5-індекси 'cameras_fts' і 'locations_fts' для пошуку за підрядком назви камери та місця,
+        якщо вони ще не існують. Дані з колишньої схеми API ('photos') переносяться в 'images' один раз.
+        """
         try:
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS images (
-                    id INTEGER PRIMARY KEY,
-                    file_path TEXT UNIQUE NOT NULL,
-                    capture_date TEXT,
-                    camera_model TEXT,
-                    latitude REAL,
-                    longitude REAL
-                )
+            image_columns = self._table_columns('images')
+            with self._write_transaction():
+                # Довідники камер і місць: у images зберігається лише цілочисельний ключ
+                # замість рядка, що повторюється в кожному рядку
+                for table in ('cameras', 'locations'):
+                    self.cursor.execute(f'''
+                        CREATE TABLE IF NOT EXISTS {table} (
+                            id INTEGER PRIMARY KEY,
+                            name TEXT UNIQUE NOT NULL
+                        )
+                    ''')
+                self.cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS images (
+                        id INTEGER PRIMARY KEY,
+                        file_path TEXT UNIQUE NOT NULL,
+                        capture_date TEXT,
+                        camera_id INTEGER REFERENCES cameras(id),
+                        location_id INTEGER REFERENCES locations(id),
+                        latitude REAL,
+                        longitude REAL
+                    )
+                ''')
+                if 'camera_model' in image_columns:
+                    self._migrate_image_name_columns(image_columns)
+                self.cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tags (
+                        id INTEGER PRIMARY KEY,
+                        name TEXT UNIQUE NOT NULL
+                    )
+                ''')
+                self.cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS image_tags (
+                        image_id INTEGER,
+                        tag_id INTEGER,
+                        PRIMARY KEY (image_id, tag_id),
+                        FOREIGN KEY (image_id) REFERENCES images(id) ON DELETE CASCADE,
+                        FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
+                    )
+                ''')
+                # Індекси для фільтрів у search_images.
+                # tags.name вже проіндексовано через обмеження UNIQUE.
+                self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_capture_date ON images(capture_date)')
+                self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_camera_id ON images(camera_id)')
+                self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_location_id ON images(location_id)')
+                self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_image_tags_tag_id ON image_tags(tag_id, image_id)')
+                self._create_name_fts('cameras')
+                self._create_name_fts('locations')
+                self._migrate_photos_table()
+        except sqlite3.Error as e:
+            print(f"Помилка створення таблиць: {e}")
+
+    def _table_columns(self, table: str) -> set:
+        """Повертає множину назв стовпців таблиці (порожню, якщо таблиці немає)."""
+        self.cursor.execute(f'PRAGMA table_info({table})')
+        return {row['name'] for row in self.cursor.fetchall()}
+
+    def _create_name_fts(self, table: str):
+        """
+        Створює зовнішньоконтентну FTS5-таблицю '<table>_fts' (токенізатор trigram) над стовпцем name
+        довідника з тригерами синхронізації та індексує вже наявні рядки, якщо її ще немає.
+        Викликається всередині транзакції _create_tables.
+        """
+        fts = f'{table}_fts'
+        if self._table_columns(fts):
+            return
+        self.cursor.execute(f'''
+            CREATE VIRTUAL TABLE {fts} USING fts5(
+                name, content='{table}', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        self.cursor.execute(f'''
+            CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, name) VALUES (new.id, new.name);
+            END
+        ''')
+        self.cursor.execute(f'''
+            CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, name) VALUES ('delete', old.id, old.name);
+            END
+        ''')
+        self.cursor.execute(f'''
+            CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, name) VALUES ('delete', old.id, old.name);
+                INSERT INTO {fts} (rowid, name) VALUES (new.id, new.name);
+            END
+        ''')
+        self.cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+    def _migrate_image_name_columns(self, image_columns: set):
+        """
+        Одноразова міграція баз, створених до появи довідників: переносить текстові стовпці
+        images.camera_model та images.location у 'cameras'/'locations' і замінює їх ключами
+        camera_id/location_id. Колишній FTS5-індекс 'images_fts' над текстовими стовпцями видаляється.
+        Викликається всередині транзакції _create_tables.
+        """
+        for trigger in ('images_fts_ai', 'images_fts_ad', 'images_fts_au'):
+            self.cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        self.cursor.execute('DROP TABLE IF EXISTS images_fts')
+        self.cursor.execute('DROP INDEX IF EXISTS idx_images_camera_model')
+        for column, key, table in (('camera_model', 'camera_id', 'cameras'), ('location', 'location_id', 'locations')):
+            self.cursor.execute(f'ALTER TABLE images ADD COLUMN {key} INTEGER REFERENCES {table}(id)')
+            if column not in image_columns:
+                continue
+            self.cursor.execute(f'''
+                INSERT OR IGNORE INTO {table} (name)
+                SELECT DISTINCT {column} FROM images WHERE {column} IS NOT NULL
             ''')
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tags (
-                    id INTEGER PRIMARY KEY,
-                    name TEXT UNIQUE NOT NULL
-                )
+            self.cursor.execute(f'UPDATE images SET {key} = (SELECT id FROM {table} WHERE name = images.{column})')
+            self.cursor.execute(f'ALTER TABLE images DROP COLUMN {column}')
+
+    def _migrate_photos_table(self):
+        """
+        Переносить фотографії та їхні теги з колишньої схеми API ('photos') у 'images'
+        та 'image_tags', після чого видаляє старі таблиці. Підтримуються обидві форми 'photos':
+        початкова (текстові camera_model і location, JSON-список у стовпці tags) та
+        нормалізована (camera_id/location_id з довідниками 'cameras' і 'locations', теги в 'photo_tags').
+        Таблиці 'tags', 'cameras' та 'locations' спільні для обох схем, тож ID наявних записів зберігаються.
+        Викликається всередині транзакції _create_tables.
+        """
+        photo_columns = self._table_columns('photos')
+        if not photo_columns:
+            return
+        if 'camera_id' in photo_columns:
+            camera_model = '(SELECT name FROM cameras WHERE id = p.camera_id)'
+        else:
+            camera_model = 'p.camera_model'
+        if 'location_id' in photo_columns:
+            location = '(SELECT name FROM locations WHERE id = p.location_id)'
+        else:
+            location = 'p.location'
+        for table, name in (('cameras', camera_model), ('locations', location)):
+            self.cursor.execute(f'''
+                INSERT OR IGNORE INTO {table} (name)
+                SELECT DISTINCT {name} FROM photos p WHERE {name} IS NOT NULL
+            ''')
+        self.cursor.execute(f'''
+            INSERT OR IGNORE INTO images (file_path, capture_date, camera_id, location_id)
+            SELECT p.path, p.date_taken,
+                   (SELECT id FROM cameras WHERE name = {camera_model}),
+                   (SELECT id FROM locations WHERE name = {location})
+            FROM photos p
+            ORDER BY p.id
+        ''')
+        if 'tags' in photo_columns:
+            # Некоректний JSON у стовпці tags вважається порожнім списком
+            json_tags = "json_each(CASE WHEN json_valid(p.tags) THEN p.tags ELSE '[]' END) je"
+            self.cursor.execute(f'''
+                INSERT OR IGNORE INTO tags (name)
+                SELECT DISTINCT je.value FROM photos p, {json_tags}
+                WHERE je.type = 'text'
+            ''')
+            self.cursor.execute(f'''
+                INSERT OR IGNORE INTO image_tags (image_id, tag_id)
+                SELECT i.id, t.id
+                FROM photos p, {json_tags}
+                JOIN tags t ON t.name = je.value
+                JOIN images i ON i.file_path = p.path
             ''')
+        if self._table_columns('photo_tags'):
             self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS image_tags (
-                    image_id INTEGER,
-                    tag_id INTEGER,
-                    PRIMARY KEY (image_id, tag_id),
-                    FOREIGN KEY (image_id) REFERENCES images(id) ON DELETE CASCADE,
-                    FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
-                )
+                INSERT OR IGNORE INTO image_tags (image_id, tag_id)
+                SELECT i.id, pt.tag_id
+                FROM photo_tags pt
+                JOIN photos p ON p.id = pt.photo_id
+                JOIN images i ON i.file_path = p.path
             ''')
-            self.conn.commit()
-        except sqlite3.Error as e:
-            print(f"Помилка створення таблиць: {e}")
+        for table in ('photo_tags', 'photos'):
+            self.cursor.execute(f'DROP TABLE IF EXISTS {table}')
 
+    @_locked
     def close(self):
-        """Закриває з'єднання з базою даних."""
+        """Закриває з'єднання з базою даних, зокрема з'єднання пулу читачів."""
+        if self._readers is not None:
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            self._readers = None
         if self.conn:
             self.conn.close()
             self.conn = None
@@ -72,8 +419,10 @@ class DatabaseManager:
         """Точка виходу для менеджера контексту, забезпечує закриття з'єднання."""
         self.close()
 
+    @_locked
     def add_image(self, file_path: str, capture_date: str, camera_model: Optional[str] = None,
-                  latitude: Optional[float] = None, longitude: Optional[float] = None) -> Optional[int]:
+                  latitude: Optional[float] = None, longitude: Optional[float] = None,
+                  location: Optional[str] = None) -> Optional[int]:
         """
         Додає новий запис зображення до бази даних.
 
@@ -83,18 +432,22 @@ class DatabaseManager:
             camera_model (Optional[str]): Модель камери, яка використовувалася.
             latitude (Optional[float]): Географічна широта.
             longitude (Optional[float]): Географічна довгота.
+            location (Optional[str]): Назва місця зйомки.
 
         Returns:
             Optional[int]: ID щойно доданого зображення, або None, якщо сталася помилка
                            (наприклад, file_path вже існує).
         """
         try:
-            self.cursor.execute('''
-                INSERT INTO images (file_path, capture_date, camera_model, latitude, longitude)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (file_path, capture_date, camera_model, latitude, longitude))
-            self.conn.commit()
-            return self.cursor.lastrowid
+            with self._write_transaction():
+                self._add_names('cameras', [camera_model])
+                self._add_names('locations', [location])
+                self.cursor.execute('''
+                    INSERT INTO images (file_path, capture_date, camera_id, location_id, latitude, longitude)
+                    VALUES (?, ?, (SELECT id FROM cameras WHERE name = ?), (SELECT id FROM locations WHERE name = ?), ?, ?)
+                ''', (file_path, capture_date, camera_model, location, latitude, longitude))
+                image_id = self.cursor.lastrowid
+            return image_id
         except sqlite3.IntegrityError:
             print(f"Помилка: Зображення зі шляхом файлу '{file_path}' вже існує.")
             return None
@@ -102,6 +455,12 @@ class DatabaseManager:
             print(f"Помилка додавання зображення: {e}")
             return None
 
+    def _add_names(self, table: str, names: List[Optional[str]]):
+        """Додає до довідника 'cameras' або 'locations' назви, яких у ньому ще немає (None пропускається)."""
+        self.cursor.executemany(f'INSERT OR IGNORE INTO {table} (name) VALUES (?)',
+                                [(name,) for name in names if name is not None])
+
+    @_locked
     def add_tag(self, tag_name: str) -> Optional[int]:
         """
         Додає новий тег до бази даних. Якщо тег вже існує, повертається його ID.
@@ -113,18 +472,20 @@ class DatabaseManager:
             Optional[int]: ID тегу, або None, якщо сталася помилка.
         """
         try:
-            self.cursor.execute('INSERT INTO tags (name) VALUES (?)', (tag_name,))
-            self.conn.commit()
-            return self.cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Тег вже існує, отримуємо його ID
-            self.cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
-            tag_id = self.cursor.fetchone()
-            return tag_id[0] if tag_id else None
+            # UPSERT з RETURNING повертає ID як нового, так і наявного тегу за один запит (SQLite 3.35+)
+            with self._write_transaction():
+                self.cursor.execute('''
+                    INSERT INTO tags (name) VALUES (?)
+                    ON CONFLICT(name) DO UPDATE SET name = excluded.name
+                    RETURNING id
+                ''', (tag_name,))
+                tag_id = self.cursor.fetchone()[0]
+            return tag_id
         except sqlite3.Error as e:
             print(f"Помилка додавання тегу '{tag_name}': {e}")
             return None
 
+    @_locked
     def link_tag_to_image(self, image_id: int, tag_id: int) -> bool:
         """
         Прив'язує тег до зображення.
@@ -137,16 +498,125 @@ class DatabaseManager:
             bool: True, якщо зв'язок успішно створено або вже існував, False в іншому випадку.
         """
         try:
-            self.cursor.execute('''
-                INSERT OR IGNORE INTO image_tags (image_id, tag_id)
-                VALUES (?, ?)
-            ''', (image_id, tag_id))
-            self.conn.commit()
+            with self._write_transaction():
+                self.cursor.execute('''
+                    INSERT OR IGNORE INTO image_tags (image_id, tag_id)
+                    VALUES (?, ?)
+                ''', (image_id, tag_id))
             return True
         except sqlite3.Error as e:
             print(f"Помилка прив'язки тегу {tag_id} до зображення {image_id}: {e}")
             return False
 
+    @_locked
+    def bulk_link_tags(self, image_id: int, tag_names: List[str]) -> bool:
+        """
+        Створює відсутні теги та прив'язує всі вказані теги до зображення в одній транзакції.
+
+        Args:
+            image_id (int): ID зображення.
+            tag_names (List[str]): Список назв тегів.
+
+        Returns:
+            bool: True, якщо зв'язки успішно створено або вже існували, False в іншому випадку.
+        """
+        try:
+            with self._write_transaction():
+                self.cursor.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)',
+                                        [(name,) for name in tag_names])
+                self.cursor.executemany('''
+                    INSERT OR IGNORE INTO image_tags (image_id, tag_id)
+                    SELECT ?, id FROM tags WHERE name = ?
+                ''', [(image_id, name) for name in tag_names])
+            return True
+        except sqlite3.Error as e:
+            print(f"Помилка прив'язки тегів {tag_names} до зображення {image_id}: {e}")
+            return False
+
+    @_locked
+    def bulk_add_images(self, images: List[Tuple[str, Optional[str], Optional[str], Optional[str], List[str]]]) -> bool:
+        """
+        Додає зображення разом з їхніми тегами в одній транзакції: по одному executemany
+        для images, tags та image_tags. Зображення, шлях яких уже є в базі, пропускаються
+        разом з тегами, тож повторне додавання не повертає теги, які користувач видалив.
+
+        Args:
+            images: Список кортежів (file_path, capture_date, camera_model, location, tag_names).
+
+        Returns:
+            bool: True, якщо дані успішно додано, False в іншому випадку.
+        """
+        try:
+            with self._write_transaction():
+                self.cursor.execute(
+                    'SELECT file_path FROM images WHERE file_path IN (SELECT value FROM json_each(?))',
+                    (json.dumps([image[0] for image in images]),)
+                )
+                existing_paths = {row['file_path'] for row in self.cursor.fetchall()}
+                new_images = [image for image in images if image[0] not in existing_paths]
+                self._add_names('cameras', [image[2] for image in new_images])
+                self._add_names('locations', [image[3] for image in new_images])
+                self.cursor.executemany('''
+                    INSERT OR IGNORE INTO images (file_path, capture_date, camera_id, location_id)
+                    VALUES (?, ?, (SELECT id FROM cameras WHERE name = ?), (SELECT id FROM locations WHERE name = ?))
+                ''', [image[:4] for image in new_images])
+                self.cursor.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)',
+                                        [(tag,) for image in new_images for tag in image[4]])
+                self.cursor.executemany('''
+                    INSERT OR IGNORE INTO image_tags (image_id, tag_id)
+                    SELECT i.id, t.id FROM images i, tags t WHERE i.file_path = ? AND t.name = ?
+                ''', [(image[0], tag) for image in new_images for tag in image[4]])
+            return True
+        except sqlite3.Error as e:
+            print(f"Помилка додавання зображень: {e}")
+            return False
+
+    @_locked
+    def update_image_tags(self, image_id: int, add_tags: Optional[List[str]] = None,
+                          remove_tags: Optional[List[str]] = None) -> bool:
+        """
+        Додає та видаляє теги зображення в одній транзакції. Тег, присутній в обох списках,
+        вважається видаленим. Відсутні теги створюються.
+
+        Args:
+            image_id (int): ID зображення.
+            add_tags (Optional[List[str]]): Назви тегів для додавання.
+            remove_tags (Optional[List[str]]): Назви тегів для видалення.
+
+        Returns:
+            bool: True, якщо теги оновлено, False, якщо зображення не існує або сталася помилка.
+        """
+        params = {
+            'image_id': image_id,
+            'add': json.dumps(add_tags or []),
+            'remove': json.dumps(remove_tags or []),
+        }
+        try:
+            with self._write_transaction():
+                self.cursor.execute('SELECT 1 FROM images WHERE id = ?', (image_id,))
+                if self.cursor.fetchone() is None:
+                    return False
+                if add_tags:
+                    self.cursor.execute('''
+                        INSERT OR IGNORE INTO tags (name)
+                        SELECT value FROM json_each(:add) EXCEPT SELECT value FROM json_each(:remove)
+                    ''', params)
+                    self.cursor.execute('''
+                        INSERT OR IGNORE INTO image_tags (image_id, tag_id)
+                        SELECT :image_id, id FROM tags WHERE name IN
+                            (SELECT value FROM json_each(:add) EXCEPT SELECT value FROM json_each(:remove))
+                    ''', params)
+                if remove_tags:
+                    self.cursor.execute('''
+                        DELETE FROM image_tags WHERE image_id = :image_id AND tag_id IN
+                            (SELECT id FROM tags WHERE name IN (SELECT value FROM json_each(:remove)))
+                    ''', params)
+            return True
+        except sqlite3.Error as e:
+            print(f"Помилка оновлення тегів зображення {image_id}: {e}")
+            return False
+
+    @_locked
     def get_all_tags(self) -> List[Dict[str, Any]]:
         """
         Отримує всі теги з бази даних.
@@ -157,6 +627,7 @@ class DatabaseManager:
         self.cursor.execute('SELECT id, name FROM tags ORDER BY name')
         return [{'id': row[0], 'name': row[1]} for row in self.cursor.fetchall()]
 
+    @_locked
     def delete_tag(self, tag_id: int) -> bool:
         """
         Видаляє тег з бази даних та всі його асоціації із зображеннями.
@@ -169,9 +640,10 @@ class DatabaseManager:
         """
         try:
             # ON DELETE CASCADE у таблиці image_tags обробляє видалення асоціацій
-            self.cursor.execute('DELETE FROM tags WHERE id = ?', (tag_id,))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            with self._write_transaction():
+                self.cursor.execute('DELETE FROM tags WHERE id = ?', (tag_id,))
+                deleted = self.cursor.rowcount > 0
+            return deleted
         except sqlite3.Error as e:
             print(f"Помилка видалення тегу {tag_id}: {e}")
             return False
@@ -188,31 +660,7 @@ class DatabaseManager:
         """
         if not tag_names:
             return []
-
-        placeholders = ','.join(['?' for _ in tag_names])
-        query = f'''
-            SELECT
-                i.id, i.file_path, i.capture_date, i.camera_model, i.latitude, i.longitude
-            FROM
-                images i
-            JOIN
-                image_tags it ON i.id = it.image_id
-            JOIN
-                tags t ON it.tag_id = t.id
-            WHERE
-                t.name IN ({placeholders})
-            GROUP BY
-                i.id
-            HAVING
-                COUNT(DISTINCT t.id) = ?
-        '''
-        try:
-            self.cursor.execute(query, tag_names + [len(tag_names)])
-            columns = [description[0] for description in self.cursor.description]
-            return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
-        except sqlite3.Error as e:
-            print(f"Помилка отримання зображень за тегами: {e}")
-            return []
+        return self.search_images(tag_names=tag_names)
 
     def get_images_by_metadata(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
                                camera_model: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -227,27 +675,90 @@ class DatabaseManager:
         Returns:
             List[Dict[str, Any]]: Список словників, кожен з яких представляє зображення.
         """
-        query = 'SELECT id, file_path, capture_date, camera_model, latitude, longitude FROM images WHERE 1=1'
-        params = []
+        return self.search_images(start_date=start_date, end_date=end_date, camera_model=camera_model)
 
-        if start_date:
-            query += ' AND capture_date >= ?'
-            params.append(start_date)
-        if end_date:
-            query += ' AND capture_date <= ?'
-            params.append(end_date)
-        if camera_model:
-            query += ' AND camera_model LIKE ?'
-            params.append(f'%{camera_model}%')
+    def search_images(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      camera_model: Optional[str] = None, location: Optional[str] = None,
+                      tag_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Отримує зображення, що відповідають усім заданим фільтрам, одним запитом:
+        метадані та теги перетинаються в SQL, а не в Python.
+
+        Args:
+            start_date (Optional[str]): Початкова дата для фільтрації (наприклад, 'YYYY-MM-DD').
+            end_date (Optional[str]): Кінцева дата для фільтрації (наприклад, 'YYYY-MM-DD').
+            camera_model (Optional[str]): Часткова або повна назва моделі камери.
+            location (Optional[str]): Часткова або повна назва місця зйомки.
+            tag_names (Optional[List[str]]): Теги, які мають бути в зображення (УСІ).
 
+        Returns:
+            List[Dict[str, Any]]: Список словників, кожен з яких представляє зображення.
+        """
+        query, params = _images_query_params(start_date, end_date, camera_model, location, tag_names)
         try:
-            self.cursor.execute(query, params)
-            columns = [description[0] for description in self.cursor.description]
-            return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+            with self._read_connection() as conn:
+                return [dict(row) for row in conn.execute(query, params).fetchall()]
         except sqlite3.Error as e:
-            print(f"Помилка отримання зображень за метаданими: {e}")
+            print(f"Помилка пошуку зображень: {e}")
             return []
 
+    def iter_images(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    camera_model: Optional[str] = None, location: Optional[str] = None,
+                    tag_names: Optional[List[str]] = None,
+                    batch_size: int = IN_QUERY_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Те саме, що search_images, але повертає результат порціями по batch_size рядків.
+        З'єднання з пулу читачів утримується до вичерпання або закриття генератора.
+
+        Args:
+            start_date, end_date, camera_model, location, tag_names: Фільтри, як у search_images.
+            batch_size (int): Кількість зображень в одній порції.
+
+        Returns:
+            Iterator[List[Dict[str, Any]]]: Генератор непорожніх списків зображень.
+        """
+        query, params = _images_query_params(start_date, end_date, camera_model, location, tag_names)
+        if self._readers is None:
+            yield from self._iter_images_locked(query, params, batch_size)
+            return
+        try:
+            with self._read_connection() as conn:
+                cursor = conn.execute(query, params)
+                try:
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            return
+                        yield [dict(row) for row in rows]
+                finally:
+                    cursor.close()
+        except sqlite3.Error as e:
+            print(f"Помилка пошуку зображень: {e}")
+
+    def _iter_images_locked(self, query: str, params: Dict[str, Any],
+                            batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """
+        iter_images без пулу читачів: читає через з'єднання для запису, утримуючи блокування
+        лише на час читання однієї порції, тож інші виклики можуть виконуватися між порціями.
+        """
+        cursor = None
+        try:
+            with self._lock:
+                cursor = self.conn.execute(query, params)  # Окремий курсор, щоб не конфліктувати з self.cursor
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"Помилка пошуку зображень: {e}")
+        finally:
+            if cursor is not None:
+                with self._lock:
+                    cursor.close()
+
+    @_locked
     def get_image_by_id(self, image_id: int) -> Optional[Dict[str, Any]]:
         """
         Допоміжна функція для отримання одного зображення за його ID.
@@ -259,16 +770,18 @@ class DatabaseManager:
             Optional[Dict[str, Any]]: Словник, що представляє зображення, або None, якщо не знайдено.
         """
         try:
-            self.cursor.execute('SELECT id, file_path, capture_date, camera_model, latitude, longitude FROM images WHERE id = ?', (image_id,))
+            self.cursor.execute(f'''
+                SELECT {IMAGE_COLUMNS}
+                FROM {IMAGES_WITH_NAMES}
+                WHERE i.id = ?
+            ''', (image_id,))
             row = self.cursor.fetchone()
-            if row:
-                columns = [description[0] for description in self.cursor.description]
-                return dict(zip(columns, row))
-            return None
+            return dict(row) if row else None
         except sqlite3.Error as e:
             print(f"Помилка отримання зображення за ID {image_id}: {e}")
             return None
 
+    @_locked
     def get_tags_for_image(self, image_id: int) -> List[Dict[str, Any]]:
         """
         Допоміжна функція для отримання всіх тегів, пов'язаних з конкретним зображенням.
@@ -292,6 +805,37 @@ class DatabaseManager:
             print(f"Помилка отримання тегів для зображення {image_id}: {e}")
             return []
 
+    def get_tags_for_images(self, image_ids: List[int]) -> Dict[int, List[str]]:
+        """
+        Отримує назви тегів для кількох зображень одним запитом (на кожні IN_QUERY_CHUNK_SIZE ID)
+        замість окремого виклику get_tags_for_image для кожного зображення.
+
+        Args:
+            image_ids (List[int]): Список ID зображень.
+
+        Returns:
+            Dict[int, List[str]]: Словник {image_id: [назви тегів]}, відсортованих за назвою.
+                                  Для зображень без тегів повертається порожній список.
+        """
+        tags_by_image: Dict[int, List[str]] = defaultdict(list)
+        try:
+            with self._read_connection() as conn:
+                for start in range(0, len(image_ids), IN_QUERY_CHUNK_SIZE):
+                    chunk = image_ids[start:start + IN_QUERY_CHUNK_SIZE]
+                    placeholders = ','.join(['?' for _ in chunk])
+                    rows = conn.execute(f'''
+                        SELECT it.image_id, t.name
+                        FROM image_tags it
+                        JOIN tags t ON t.id = it.tag_id
+                        WHERE it.image_id IN ({placeholders})
+                        ORDER BY t.name
+                    ''', tuple(chunk)).fetchall()
+                    for image_id, name in rows:
+                        tags_by_image[image_id].append(name)
+        except sqlite3.Error as e:
+            print(f"Помилка отримання тегів для зображень: {e}")
+        return tags_by_image
+
 # Приклад використання (для демонстрації, може бути розміщений в окремому тестовому файлі)
 if __name__ == '__main__':
     db_file = 'test_photo_ai_navigator.db'
@@ -302,7 +846,8 @@ if __name__ == '__main__':
 
     print(f"Використовується база даних: {db_file}")
 
-    with DatabaseManager(db_path=db_file) as db:
+    db = DatabaseManager(db_path=db_file)
+    try:
         print("--- Додавання зображень ---")
         img1_id = db.add_image('/path/to/img1.jpg', '2023-01-15 10:00:00', 'Canon EOS R5', 40.7128, -74.0060)
         img2_id = db.add_image('/path/to/img2.png', '2023-01-20 14:30:00', 'Sony Alpha A7 III', 34.0522, -118.2437)
@@ -315,8 +860,7 @@ if __name__ == '__main__':
 
         print(f"Додані зображення: img1_id={img1_id}, img2_id={img2_id}, img3_id={img3_id}, img4_id={img4_id}, img5_id={img5_id}")
 
-        print("
---- Додавання тегів ---")
+        print("\n--- Додавання тегів ---")
         tag_nature_id = db.add_tag('Nature')
         tag_city_id = db.add_tag('City')
         tag_landscape_id = db.add_tag('Landscape')
@@ -330,87 +874,73 @@ if __name__ == '__main__':
 
         print(f"Додані теги: Nature={tag_nature_id}, City={tag_city_id}, Landscape={tag_landscape_id}, Portrait={tag_portrait_id}")
 
-        print("
---- Прив'язка тегів до зображень ---")
-        if img1_id and tag_city_id and tag_newyork_id:
-            db.link_tag_to_image(img1_id, tag_city_id)
-            db.link_tag_to_image(img1_id, tag_newyork_id)
-            db.link_tag_to_image(img1_id, tag_landscape_id) # img1 - це міський пейзаж
+        print("\n--- Прив'язка тегів до зображень ---")
+        if img1_id:
+            db.bulk_link_tags(img1_id, ['City', 'New York', 'Landscape']) # img1 - це міський пейзаж
 
         if img2_id and tag_city_id:
             db.link_tag_to_image(img2_id, tag_city_id)
 
-        if img3_id and tag_city_id and tag_london_id:
-            db.link_tag_to_image(img3_id, tag_city_id)
-            db.link_tag_to_image(img3_id, tag_london_id)
+        if img3_id:
+            db.bulk_link_tags(img3_id, ['City', 'London'])
 
-        if img4_id and tag_nature_id and tag_landscape_id:
-            db.link_tag_to_image(img4_id, tag_nature_id)
-            db.link_tag_to_image(img4_id, tag_landscape_id)
+        if img4_id:
+            db.bulk_link_tags(img4_id, ['Nature', 'Landscape'])
 
-        if img5_id and tag_city_id and tag_tokyo_id:
-            db.link_tag_to_image(img5_id, tag_city_id)
-            db.link_tag_to_image(img5_id, tag_tokyo_id)
+        if img5_id:
+            db.bulk_link_tags(img5_id, ['City', 'Tokyo'])
 
-        print("
---- Всі теги ---")
+        print("\n--- Всі теги ---")
         all_tags = db.get_all_tags()
         for tag in all_tags:
             print(f"- {tag['name']} (ID: {tag['id']})")
 
-        print("
---- Зображення за тегами (City та Landscape) ---")
+        print("\n--- Зображення за тегами (City та Landscape) ---")
         city_landscape_images = db.get_images_by_tags(['City', 'Landscape'])
+        tags_by_image = db.get_tags_for_images([img['id'] for img in city_landscape_images])
         for img in city_landscape_images:
             print(f"- {img['file_path']} (ID: {img['id']})")
-            tags_for_img = db.get_tags_for_image(img['id'])
-            print(f"  Теги: {[t['name'] for t in tags_for_img]}")
+            print(f"  Теги: {tags_by_image[img['id']]}")
 
-        print("
---- Зображення за тегами (Nature) ---")
+        print("\n--- Зображення за тегами (Nature) ---")
         nature_images = db.get_images_by_tags(['Nature'])
         for img in nature_images:
             print(f"- {img['file_path']} (ID: {img['id']})")
 
-        print("
---- Зображення за метаданими (Canon EOS R5) ---")
+        print("\n--- Зображення за метаданими (Canon EOS R5) ---")
         canon_images = db.get_images_by_metadata(camera_model='Canon EOS R5')
         for img in canon_images:
             print(f"- {img['file_path']} (Камера: {img['camera_model']})")
 
-        print("
---- Зображення за метаданими (Діапазон дат: Січень 2023) ---")
+        print("\n--- Зображення за метаданими (Діапазон дат: Січень 2023) ---")
         jan_images = db.get_images_by_metadata(start_date='2023-01-01', end_date='2023-01-31')
         for img in jan_images:
             print(f"- {img['file_path']} (Дата: {img['capture_date']})")
 
-        print("
---- Зображення за метаданими (Sony Alpha A7 III у березні 2023) ---")
+        print("\n--- Зображення за метаданими (Sony Alpha A7 III у березні 2023) ---")
         sony_march_images = db.get_images_by_metadata(start_date='2023-03-01', end_date='2023-03-31', camera_model='Sony Alpha A7 III')
         for img in sony_march_images:
             print(f"- {img['file_path']} (Дата: {img['capture_date']}, Камера: {img['camera_model']})")
 
-        print("
---- Видалення тегу (New York) ---")
+        print("\n--- Видалення тегу (New York) ---")
         if tag_newyork_id:
             deleted = db.delete_tag(tag_newyork_id)
             print(f"Тег 'New York' видалено: {deleted}")
 
-        print("
---- Всі теги після видалення ---")
+        print("\n--- Всі теги після видалення ---")
         all_tags_after_delete = db.get_all_tags()
         for tag in all_tags_after_delete:
             print(f"- {tag['name']} (ID: {tag['id']})")
 
-        print("
---- Зображення за тегами (City та New York) після видалення ---")
+        print("\n--- Зображення за тегами (City та New York) після видалення ---")
         # Це повинно повернути менше зображень або жодного, якщо New York був єдиним відмінним тегом
         city_newyork_images_after_delete = db.get_images_by_tags(['City', 'New York'])
         if not city_newyork_images_after_delete:
             print("Зображень з тегами 'City' та 'New York' не знайдено (оскільки 'New York' було видалено або не було пов'язано з іншими зображеннями).")
         for img in city_newyork_images_after_delete:
             print(f"- {img['file_path']} (ID: {img['id']})")
+    finally:
+        db.close()
 
-    print("
-Операції з базою даних завершено. З'єднання закрито.")
+    print("\nОперації з базою даних завершено. З'єднання закрито.")
     # os.remove(db_file) # Розкоментуйте, щоб видалити файл тестової бази даних після запуску
\ No newline at end of file
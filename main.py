@@ -1,5 +1,7 @@
 import uvicorn
 import os
+import importlib.util
+import multiprocessing
 
 # Ensure the Tesseract executable path is set if not in PATH
 # This is crucial for PyInstaller bundles or non-standard installations.
@@ -12,13 +14,45 @@ import os
 # except ImportError:
 #     print("Pytesseract not installed or Tesseract executable not found.")
 
+SAMPLE_PHOTOS = [
+    ("C:/photos/vacation/beach.jpg", "2023-07-15 10:30:00", "Canon EOS R5", "Пляж", ["відпустка", "пляж", "літо"]),
+    ("C:/photos/city/skyline.png", "2023-01-20 18:00:00", "Sony Alpha 7 III", "Центр міста", ["місто", "ніч", "архітектура"]),
+    ("C:/photos/nature/mountain.jpeg", "2022-09-01 08:00:00", "Nikon D850", "Гори", ["природа", "похід", "пейзаж"]),
+    ("C:/photos/family/birthday.jpg", "2023-03-10 14:00:00", "iPhone 13 Pro", "Дім", ["сім'я", "день народження", "свято"]),
+]
+
+def seed_sample_data(db):
+    """Adds the sample photos and their tags in one transaction; photos already in the database are skipped."""
+    db.bulk_add_images(SAMPLE_PHOTOS)
+
 if __name__ == "__main__":
+    # Required for multi-worker mode inside PyInstaller bundles
+    multiprocessing.freeze_support()
     # Ensure the database directory exists
     os.makedirs("data", exist_ok=True)
-    # You might want to initialize the database here as well
-    from database.db import init_db
-    init_db()
+    # Initialize the database once, before any worker starts
+    from api.main import DATABASE_FILE
+    from database.db import DatabaseManager
+    db = DatabaseManager(DATABASE_FILE)
+    # Seed sample data only on request, so reloads and extra workers don't redo it
+    if os.environ.get("SEED_DB") == "1":
+        seed_sample_data(db)
+    db.close()
 
     print("Starting FastAPI application...")
-    uvicorn.run("api.main:app", host="0.0.0.0", port=8000, reload=True)
-    # reload=True is good for development, set to False for production/PyInstaller
+    if os.environ.get("DEV"):
+        # Single process with auto-reload for development
+        uvicorn.run("api.main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        # One worker per core (leaving one for the OS); each worker opens its own
+        # connection pools, and WAL lets their readers run concurrently.
+        # uvloop/httptools are used when installed (uvloop is not available on Windows).
+        uvicorn.run(
+            "api.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=False,
+            workers=max(1, (os.cpu_count() or 1) - 1),
+            loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+            http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        )
@@ -1,48 +1,534 @@
 import tensorflow as tf
 from tensorflow.keras.applications.mobilenet_v2 import MobileNetV2, preprocess_input, decode_predictions
-from tensorflow.keras.preprocessing import image
 import numpy as np
 import cv2
-import pytesseract
 import os
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
+
+try:
+    # Необов'язкові залежності для семантичного пошуку за вбудовуваннями (див. semantic_search)
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    faiss = None
+    SentenceTransformer = None
+
+from processing.ocr_worker import (
+    OCR_LANG, OCR_OEM, OCR_PSM, tesseract_config, init_ocr_worker, ocr_image_file,
+)
+
+logger = logging.getLogger(__name__)
+
+# --- КОНФІГУРАЦІЯ TFLITE ---
+# Каталог, у якому зберігається квантизована TFLite-модель, щоб конвертація виконувалася лише один раз.
+# Користувацький каталог кешу, а не каталог пакета, який після встановлення може бути лише для читання.
+TFLITE_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                                'photoai_navigator')
+# Кількість зображень, на яких калібрується повна int8-квантизація.
+TFLITE_CALIBRATION_SAMPLES = 100
+# Компілювати граф передбачення моделі Keras через XLA (див. _build_predict_function).
+# XLA компілює окреме ядро для кожного конкретного розміру пакета, тож без фіксованого розміру
+# кожен новий розмір (наприклад, останній неповний пакет) оплачується повторною компіляцією.
+PREDICT_JIT_COMPILE = False
+
+# --- КОНФІГУРАЦІЯ КЕШУ ---
+# Розмір блоку, яким файл читається для обчислення хешу вмісту
+HASH_CHUNK_SIZE = 1 << 20
+# SQLite-файл, у якому теги, текст OCR та хеші файлів зберігаються між запусками
+RESULT_CACHE_FILE = '.photoai_cache.db'
+# Теги залежать від моделі (TFLite int8/dynamic/float16 або Keras), а текст OCR - від налаштувань
+# Tesseract, тож вони входять до ключів tag_results та ocr_results відповідно
+RESULT_CACHE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS file_hashes (
+        path TEXT PRIMARY KEY,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        hash TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS tag_results (
+        hash TEXT NOT NULL,
+        model TEXT NOT NULL,
+        top_n INTEGER NOT NULL,
+        tags TEXT NOT NULL,
+        PRIMARY KEY (hash, model, top_n)
+    );
+    CREATE TABLE IF NOT EXISTS ocr_results (
+        hash TEXT NOT NULL,
+        settings TEXT NOT NULL,
+        force INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (hash, settings, force)
+    );
+'''
+
+# --- КОНФІГУРАЦІЯ СЕМАНТИЧНОГО ПОШУКУ ---
+EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+# Параметри HNSW: кількість зв'язків вузла, ширина пошуку під час побудови та під час запиту
+EMBEDDING_HNSW_M = 32
+EMBEDDING_HNSW_EF_CONSTRUCTION = 200
+EMBEDDING_HNSW_EF_SEARCH = 128
+# Починаючи з цієї кількості зображень, використовується стиснений індекс IVFPQ
+EMBEDDING_IVFPQ_THRESHOLD = 1_000_000
+EMBEDDING_IVF_NLIST = 4096
+# Кількість списків IVF, які переглядаються під час запиту (типове значення FAISS - 1 з EMBEDDING_IVF_NLIST)
+EMBEDDING_IVF_NPROBE = 64
+EMBEDDING_PQ_M = 16
+
+# --- КОНФІГУРАЦІЯ OCR ---
+# Кількість зображень, які передаються процесу-воркеру за один раз
+OCR_CHUNK_SIZE = 4
+
+# Роздільник записів у буферах пошуку (див. index_metadata): запит його не містить,
+# тож знайдений підрядок ніколи не перетинає межу двох записів
+_SEARCH_SEPARATOR = "\x00"
+
+def _concat_with_offsets(texts):
+    """
+    Об'єднує рядки в один буфер через _SEARCH_SEPARATOR.
 
-# --- КОНФІГУРАЦІЯ PYTESSERACT ---
-# ВАЖЛИВО: Замініть 'path/to/tesseract' на фактичний шлях до вашого виконуваного файлу Tesseract OCR.
-# Для Windows це може бути щось на зразок r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-# Для Linux/macOS він зазвичай знаходиться в PATH, але якщо ні, вкажіть його тут.
-# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+    Повертає:
+        tuple: (буфер, масив int64 з позиціями початку кожного запису в буфері).
+    """
+    lengths = np.fromiter((len(text) + 1 for text in texts), dtype=np.int64, count=len(texts))
+    starts = np.zeros(len(texts), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return _SEARCH_SEPARATOR.join(texts), starts
+
+def _find_records(buffer, starts, needle):
+    """
+    Повертає індекси записів буфера, що містять needle як підрядок. Пошук виконується
+    str.find по всьому буферу; після збігу він продовжується з наступного запису,
+    тож кожен запис повертається не більше одного разу.
+    """
+    if len(starts) == 0 or _SEARCH_SEPARATOR in needle:
+        return []
+    records = []
+    position = buffer.find(needle)
+    while position != -1:
+        record = int(np.searchsorted(starts, position, side='right')) - 1
+        records.append(record)
+        if record + 1 == len(starts):
+            break
+        position = buffer.find(needle, int(starts[record + 1]))
+    return records
 
 class PhotoAINavigatorProcessor:
     """
     Модуль обробки зображень для PhotoAI Navigator.
     Надає функціональність для автоматичного тегування, OCR та базового семантичного пошуку.
     """
-    def __init__(self):
-        print("Ініціалізація модуля PhotoAI Navigator Processor...")
+    def __init__(self, calibration_images=None, use_fp16=False,
+                 ocr_lang=OCR_LANG, ocr_oem=OCR_OEM, ocr_psm=OCR_PSM, ocr_char_whitelist=None,
+                 cache_path=RESULT_CACHE_FILE):
+        """
+        Аргументи:
+            calibration_images (list): Необов'язковий список шляхів до зображень для калібрування
+                                       повної int8-квантизації TFLite-моделі. Без нього ваги
+                                       квантизуються в int8 динамічно, а вхід лишається float32.
+            use_fp16 (bool): Обчислювати модель Keras у змішаній точності (mixed_float16), а TFLite-модель
+                             без калібрувальних зображень конвертувати з вагами float16. Прискорює
+                             інференс на GPU та CPU з підтримкою FP16; softmax завжди рахується у float32.
+            ocr_lang (str): Мова (мови) Tesseract, наприклад 'eng' або 'eng+ukr'.
+            ocr_oem (int): Режим двигуна Tesseract (--oem).
+            ocr_psm (int): Режим сегментації сторінки Tesseract (--psm).
+            ocr_char_whitelist (str): Необов'язковий набір символів, якими обмежується розпізнавання.
+            cache_path (str): SQLite-файл для збереження результатів між запусками; None - лише кеш у пам'яті.
+        """
+        self.use_fp16 = use_fp16
+        # Налаштування Tesseract: аргументи ініціалізації воркерів OCR та параметри для pytesseract
+        self._ocr_worker_args = (ocr_lang, ocr_oem, ocr_psm, ocr_char_whitelist)
+        self.ocr_lang = ocr_lang
+        self.ocr_config = tesseract_config(ocr_oem, ocr_psm, ocr_char_whitelist)
+        self._ocr_settings_key = f"{ocr_lang} {self.ocr_config}"
+        # Пул процесів OCR створюється під час першого виклику extract_text_from_images
+        # і живе до close(), тож воркери завантажують мовну модель Tesseract лише один раз
+        self._ocr_executor = None
+        self._ocr_executor_workers = None
+        logger.info("Ініціалізація модуля PhotoAI Navigator Processor...")
+        # Пристрій, на якому розміщуються ваги моделі Keras і виконується її інференс
+        self._device = '/GPU:0' if tf.config.list_physical_devices('GPU') else '/CPU:0'
         # Завантаження попередньо навченої моделі MobileNetV2 для класифікації зображень.
         # 'weights='imagenet'' гарантує використання ваг, навчених на ImageNet.
         try:
-            self.image_tagging_model = MobileNetV2(weights='imagenet')
-            print("Модель MobileNetV2 успішно завантажена.")
+            with tf.device(self._device):
+                self.image_tagging_model = self._build_tagging_model()
+            logger.info("Модель MobileNetV2 успішно завантажена.")
         except Exception as e:
-            print(f"Помилка завантаження моделі MobileNetV2: {e}")
-            print("Переконайтеся, що у вас є підключення до Інтернету для завантаження ваг,")
-            print("або що ваги вже завантажені локально.")
+            logger.error("Помилка завантаження моделі MobileNetV2: %s. "
+                         "Переконайтеся, що у вас є підключення до Інтернету для завантаження ваг, "
+                         "або що ваги вже завантажені локально.", e)
             self.image_tagging_model = None
 
+        # Скомпільований граф передбачення замість predict()/predict_on_batch() Keras
+        self._predict = None
+        if self.image_tagging_model is not None:
+            self._predict = self._build_predict_function()
+
+        # TFLite-інтерпретатор зберігає вхідний і вихідний тензори в собі, тож
+        # set_tensor/invoke/get_tensor з різних потоків (наприклад, через asyncio.to_thread) серіалізуються
+        self._tflite_lock = threading.Lock()
+
+        # Кеші результатів за хешем вмісту файлу (див. _content_hash):
+        # (хеш, модель, top_n) -> теги та (хеш, force) -> текст OCR.
+        # _file_hashes зберігає для шляху (mtime, розмір, хеш), щоб не перечитувати незмінні файли.
+        # Усе це також записується у файл кешу (_store), тож незмінені файли не обробляються
+        # повторно і після перезапуску.
+        self._tag_cache = {}
+        self._ocr_cache = {}
+        self._file_hashes = {}
+        self._store = self._open_result_store(cache_path)
+
+        # Квантизований TFLite-інтерпретатор замінює predict() Keras у auto_tag_image на CPU.
+        # З GPU або якщо підготувати його не вдалося, використовується модель Keras.
+        self.interpreter = None
+        self._tflite_mode = None
+        if self.image_tagging_model is not None and self._device == '/CPU:0':
+            self.interpreter = self._load_tflite_interpreter(calibration_images)
+
+        # Сховище метаданих для пошуку у вигляді структури масивів (див. index_metadata)
+        self._paths = np.array([], dtype=object)
+        self._tag_offsets = np.zeros(1, dtype=np.int64)
+        self._tag_buffer, self._tag_starts = _concat_with_offsets([])
+        self._ocr_buffer, self._ocr_starts = _concat_with_offsets([])
+
+        # Модель текстових вбудовувань (завантажується під час першого index_metadata,
+        # див. _get_text_model) і FAISS-індекс для semantic_search
+        self.text_model = None
+        self._text_model_loaded = False
+        self._embedding_index = None
+        self._embedding_paths = []
+
+        self._warm_up()
+
+    def _warm_up(self):
+        """
+        Виконує пробне передбачення на порожньому зображенні, щоб трасування графа
+        та виділення пам'яті інтерпретатора відбулися під час створення процесора, а не під час
+        першого запиту користувача. OCR прогрівається у воркерах (див. ocr_worker.init_ocr_worker):
+        кожен виклик pytesseract запускає новий процес tesseract, тож прогрів тут нічого не дав би.
+        """
+        if self._predict is not None:
+            try:
+                self._predict(np.zeros((1, 224, 224, 3), dtype=np.float32))
+            except Exception as e:
+                logger.warning("Помилка прогріву моделі Keras: %s", e)
+        if self.interpreter is not None:
+            try:
+                self._predict_tflite(np.zeros((1, 224, 224, 3), dtype=np.float32))
+            except Exception as e:
+                logger.warning("Помилка прогріву TFLite-моделі: %s", e)
+
+    def _build_tagging_model(self):
+        """
+        Створює MobileNetV2. З use_fp16 модель будується з політикою mixed_float16 (ваги лишаються
+        float32, обчислення - у float16), а softmax класифікатора винесено в окремий шар float32
+        для числової стабільності. Глобальна політика Keras після побудови відновлюється.
+        """
+        if not self.use_fp16:
+            return MobileNetV2(weights='imagenet')
+
+        previous_policy = tf.keras.mixed_precision.global_policy()
+        tf.keras.mixed_precision.set_global_policy('mixed_float16')
+        try:
+            base_model = MobileNetV2(weights='imagenet', classifier_activation=None)
+            outputs = tf.keras.layers.Activation('softmax', dtype='float32')(base_model.output)
+            return tf.keras.Model(base_model.input, outputs, name=base_model.name)
+        finally:
+            tf.keras.mixed_precision.set_global_policy(previous_policy)
+
+    def _build_predict_function(self):
+        """
+        Обгортає модель у tf.function з фіксованою сигнатурою входу (пакет довільного розміру),
+        тож граф трасується один раз, а виклики не мають накладних витрат predict()
+        (адаптер даних, індикатор прогресу). Граф виконується на self._device.
+        З PREDICT_JIT_COMPILE граф додатково компілюється XLA, але окремо для кожного розміру пакета.
+        """
+        model = self.image_tagging_model
+        device = self._device
+
+        @tf.function(jit_compile=PREDICT_JIT_COMPILE,
+                     input_signature=[tf.TensorSpec([None, 224, 224, 3], tf.float32)])
+        def predict(images):
+            with tf.device(device):
+                return model(images, training=False)
+
+        return predict
+
+    def _convert_to_tflite(self, calibration_images):
+        """
+        Конвертує MobileNetV2 у TFLite з пост-тренувальною квантизацією.
+        З калібрувальними зображеннями виконується повна int8-квантизація з входом uint8,
+        з use_fp16 - квантизація ваг у float16, інакше - квантизація лише ваг (dynamic range).
+        """
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.image_tagging_model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if calibration_images:
+            def representative_dataset():
+                for img_path in calibration_images[:TFLITE_CALIBRATION_SAMPLES]:
+                    yield [self._preprocess_image_for_model(img_path)]
+
+            converter.representative_dataset = representative_dataset
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            converter.inference_input_type = tf.uint8
+        elif self.use_fp16:
+            converter.target_spec.supported_types = [tf.float16]
+        return converter.convert()
+
+    def _load_tflite_interpreter(self, calibration_images):
+        """
+        Завантажує квантизовану модель з диска або конвертує її та зберігає для наступних запусків.
+
+        Повертає:
+            tf.lite.Interpreter: Готовий інтерпретатор або None, якщо підготувати модель не вдалося.
+        """
+        if calibration_images:
+            mode = "int8"
+        elif self.use_fp16:
+            mode = "float16"
+        else:
+            mode = "dynamic"
+        model_path = os.path.join(TFLITE_CACHE_DIR, f"mobilenet_v2_{mode}.tflite")
+        try:
+            if os.path.exists(model_path):
+                with open(model_path, "rb") as f:
+                    tflite_model = f.read()
+            else:
+                logger.info("Конвертація MobileNetV2 у TFLite (%s)...", mode)
+                tflite_model = self._convert_to_tflite(calibration_images)
+                self._save_tflite_model(model_path, tflite_model)
+            interpreter = tf.lite.Interpreter(model_content=tflite_model, num_threads=os.cpu_count())
+            interpreter.allocate_tensors()
+            self._tflite_input = interpreter.get_input_details()[0]
+            self._tflite_output = interpreter.get_output_details()[0]
+            self._tflite_mode = mode
+            logger.info("TFLite-модель (%s) готова: %s", mode, model_path)
+            return interpreter
+        except Exception as e:
+            logger.warning("Помилка підготовки TFLite-моделі: %s. Буде використано модель Keras.", e)
+            return None
+
+    @staticmethod
+    def _save_tflite_model(model_path, tflite_model):
+        """
+        Зберігає конвертовану модель для наступних запусків. Запис іде у тимчасовий файл, який потім
+        атомарно перейменовується, тож перерваний запис не залишить пошкодженої моделі. Помилка
+        збереження лише журналюється: модель у пам'яті все одно використовується.
+        """
+        tmp_path = f"{model_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(model_path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(tflite_model)
+            os.replace(tmp_path, model_path)
+        except OSError as e:
+            logger.warning("Не вдалося зберегти TFLite-модель у %s: %s. Конвертація повториться під час наступного запуску.",
+                           model_path, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _predict_tflite(self, processed_image):
+        """
+        Виконує класифікацію через TFLite-інтерпретатор. Для квантизованого входу/виходу
+        значення перетворюються за параметрами квантизації моделі.
+        """
+        input_dtype = self._tflite_input['dtype']
+        if input_dtype != np.float32:
+            scale, zero_point = self._tflite_input['quantization']
+            limits = np.iinfo(input_dtype)
+            processed_image = np.clip(np.round(processed_image / scale + zero_point), limits.min, limits.max)
+        with self._tflite_lock:
+            self.interpreter.set_tensor(self._tflite_input['index'], processed_image.astype(input_dtype))
+            self.interpreter.invoke()
+            predictions = self.interpreter.get_tensor(self._tflite_output['index'])
+        if self._tflite_output['dtype'] != np.float32:
+            scale, zero_point = self._tflite_output['quantization']
+            predictions = (predictions.astype(np.float32) - zero_point) * scale
+        return predictions
+
     def _preprocess_image_for_model(self, img_path):
         """
         Допоміжна функція для завантаження та попередньої обробки зображення для моделі MobileNetV2.
+        Декодування та масштабування (INTER_AREA) виконуються в OpenCV, а перетворення BGR -> RGB
+        і нормалізація записуються одним проходом у новий масив для кожного виклику,
+        тож функцію можна викликати з кількох потоків.
+        """
+        img = cv2.imread(img_path, cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError(f"Не вдалося завантажити зображення за допомогою OpenCV за шляхом: {img_path}")
+        img = cv2.resize(img, (224, 224), interpolation=cv2.INTER_AREA) # MobileNetV2 очікує вхід 224x224
+        # BGR -> RGB та масштабування до [-1, 1], як у preprocess_input для MobileNetV2
+        processed_image = np.empty((1, 224, 224, 3), dtype=np.float32)
+        np.multiply(img[..., ::-1], 1 / 127.5, out=processed_image[0], casting='same_kind')
+        processed_image -= 1.0
+        return processed_image
+
+    def _open_result_store(self, cache_path):
+        """
+        Відкриває SQLite-файл кешу результатів, щоб теги, текст OCR та хеші файлів
+        зберігалися між запусками.
+
+        Повертає:
+            sqlite3.Connection: З'єднання або None, якщо кеш вимкнено чи файл не вдалося відкрити.
+        """
+        if not cache_path:
+            return None
+        try:
+            store = sqlite3.connect(cache_path)
+            store.execute('PRAGMA journal_mode=WAL')
+            store.execute('PRAGMA synchronous=NORMAL')
+            tag_columns = {row[1] for row in store.execute('PRAGMA table_info(tag_results)')}
+            if tag_columns and 'model' not in tag_columns:
+                # Теги, збережені без позначки моделі, невідомо якою моделлю отримані
+                store.execute('DROP TABLE tag_results')
+            store.executescript(RESULT_CACHE_SCHEMA)
+            return store
+        except sqlite3.Error as e:
+            logger.warning("Помилка відкриття файлу кешу %s: %s. Результати не зберігатимуться між запусками.",
+                           cache_path, e)
+            return None
+
+    def _store_write(self, query, rows):
+        """Записує рядки у файл кешу однією транзакцією; помилка запису не перериває обробку."""
+        if self._store is None or not rows:
+            return
+        try:
+            with self._store:
+                self._store.executemany(query, rows)
+        except sqlite3.Error as e:
+            logger.warning("Помилка запису у файл кешу: %s", e)
+
+    def _store_read(self, query, params):
+        """
+        Читає один рядок з файлу кешу. Помилка читання (наприклад, заблокований або пошкоджений файл)
+        журналюється і вважається промахом кешу, тож обробка продовжується без нього.
         """
-        img = image.load_img(img_path, target_size=(224, 224)) # MobileNetV2 очікує вхід 224x224
-        img_array = image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0) # Додаємо вимір пакету (batch dimension)
-        img_array = preprocess_input(img_array) # Попередня обробка відповідно до вимог MobileNetV2
-        return img_array
+        if self._store is None:
+            return None
+        try:
+            return self._store.execute(query, params).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Помилка читання файлу кешу: %s", e)
+            return None
+
+    def _tag_model_key(self, batched=False):
+        """
+        Повертає позначку конвеєра, який тегуватиме зображення: модель (TFLite-інтерпретатор з режимом
+        квантизації в auto_tag_image або модель Keras з точністю обчислень) та попередню обробку
+        (OpenCV INTER_AREA в auto_tag_image, білінійний tf.image.resize в auto_tag_images).
+        Входить до ключа кешу тегів, тож теги, отримані іншим конвеєром, не повертаються з кешу.
+        """
+        if batched:
+            return f"keras-{'mixed_float16' if self.use_fp16 else 'float32'}/tf-bilinear"
+        if self.interpreter is not None:
+            return f"tflite-{self._tflite_mode}/opencv-area"
+        return f"keras-{'mixed_float16' if self.use_fp16 else 'float32'}/opencv-area"
+
+    def _get_cached_tags(self, cache_key):
+        """Повертає копію тегів для ключа (хеш, модель, top_n) з кешу в пам'яті або з файлу кешу, або None."""
+        tags = self._tag_cache.get(cache_key)
+        if tags is None and cache_key[0] is not None:
+            row = self._store_read('SELECT tags FROM tag_results WHERE hash = ? AND model = ? AND top_n = ?',
+                                   cache_key)
+            if row is not None:
+                tags = self._tag_cache[cache_key] = json.loads(row[0])
+        return None if tags is None else list(tags)
+
+    def _cache_tags(self, items):
+        """Зберігає пари (ключ кешу, теги) у пам'яті та у файлі кешу. Ключі без хешу пропускаються."""
+        items = [(cache_key, list(tags)) for cache_key, tags in items if cache_key[0] is not None]
+        self._tag_cache.update(items)
+        self._store_write('INSERT OR REPLACE INTO tag_results (hash, model, top_n, tags) VALUES (?, ?, ?, ?)',
+                          [(*cache_key, json.dumps(tags)) for cache_key, tags in items])
+
+    def _get_cached_ocr(self, cache_key):
+        """Повертає текст OCR для ключа (хеш, force) з кешу в пам'яті або з файлу кешу, або None."""
+        text = self._ocr_cache.get(cache_key)
+        if text is None and cache_key[0] is not None:
+            row = self._store_read('SELECT text FROM ocr_results WHERE hash = ? AND settings = ? AND force = ?',
+                                   (cache_key[0], self._ocr_settings_key, cache_key[1]))
+            if row is not None:
+                text = self._ocr_cache[cache_key] = row[0]
+        return text
+
+    def _cache_ocr(self, items):
+        """Зберігає пари (ключ кешу, текст OCR) у пам'яті та у файлі кешу. Ключі без хешу пропускаються."""
+        items = [(cache_key, text) for cache_key, text in items if cache_key[0] is not None]
+        self._ocr_cache.update(items)
+        self._store_write('INSERT OR REPLACE INTO ocr_results (hash, settings, force, text) VALUES (?, ?, ?, ?)',
+                          [(cache_key[0], self._ocr_settings_key, cache_key[1], text) for cache_key, text in items])
+
+    def _get_ocr_executor(self, max_workers):
+        """
+        Повертає пул процесів OCR, створюючи його за потреби (або перестворюючи для іншої кількості
+        процесів). Процеси запускаються методом spawn: fork процесу з уже запущеними пулами потоків
+        TensorFlow може призвести до взаємоблокування, а spawn-воркер імпортує лише ocr_worker.
+        """
+        max_workers = max_workers or os.cpu_count()
+        if self._ocr_executor is not None and self._ocr_executor_workers != max_workers:
+            self._shutdown_ocr_executor()
+        if self._ocr_executor is None:
+            self._ocr_executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context("spawn"),
+                                                     initializer=init_ocr_worker, initargs=self._ocr_worker_args)
+            self._ocr_executor_workers = max_workers
+        return self._ocr_executor
+
+    def _shutdown_ocr_executor(self):
+        """Зупиняє пул процесів OCR, якщо він був створений."""
+        if self._ocr_executor is not None:
+            self._ocr_executor.shutdown()
+            self._ocr_executor = None
+            self._ocr_executor_workers = None
+
+    def close(self):
+        """Зупиняє пул процесів OCR і закриває файл кешу результатів."""
+        self._shutdown_ocr_executor()
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _content_hash(self, image_path):
+        """
+        Повертає BLAKE2b-хеш вмісту файлу, за яким кешуються теги та текст OCR.
+        Файл перечитується лише тоді, коли змінилися його mtime або розмір.
+
+        Повертає:
+            str: Шістнадцятковий хеш або None, якщо файл не вдалося прочитати.
+        """
+        try:
+            stat = os.stat(image_path)
+            known = self._file_hashes.get(image_path)
+            if known is None:
+                known = self._store_read('SELECT mtime_ns, size, hash FROM file_hashes WHERE path = ?',
+                                         (os.path.abspath(image_path),))
+            if known is not None and tuple(known[:2]) == (stat.st_mtime_ns, stat.st_size):
+                self._file_hashes[image_path] = tuple(known)
+                return known[2]
+            digest = hashlib.blake2b(digest_size=16)
+            with open(image_path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        content_hash = digest.hexdigest()
+        self._file_hashes[image_path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+        self._store_write('INSERT OR REPLACE INTO file_hashes (path, mtime_ns, size, hash) VALUES (?, ?, ?, ?)',
+                          [(os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size, content_hash)])
+        return content_hash
 
     def auto_tag_image(self, image_path, top_n=5):
         """
         Автоматично тегує зображення за допомогою попередньо навченої моделі MobileNetV2.
+        Результат кешується за хешем вмісту файлу, тож незмінене зображення повторно не обробляється.
 
         Аргументи:
             image_path (str): Шлях до файлу зображення.
@@ -53,66 +539,316 @@ class PhotoAINavigatorProcessor:
                   Повертає порожній список, якщо обробка не вдалася або модель не завантажена.
         """
         if self.image_tagging_model is None:
-            print("Помилка: Модель тегування зображень не завантажена.")
+            logger.error("Помилка: Модель тегування зображень не завантажена.")
             return []
 
-        if not os.path.exists(image_path):
-            print(f"Помилка: Зображення не знайдено за шляхом: {image_path}")
+        # Хеш вмісту - перше звернення до файлу; None означає, що файл не вдалося прочитати
+        cache_key = (self._content_hash(image_path), self._tag_model_key(), top_n)
+        if cache_key[0] is None:
+            logger.error("Помилка: Зображення не знайдено за шляхом: %s", image_path)
             return []
+        cached_tags = self._get_cached_tags(cache_key)
+        if cached_tags is not None:
+            return cached_tags
 
         try:
             processed_image = self._preprocess_image_for_model(image_path)
-            predictions = self.image_tagging_model.predict(processed_image)
+            if self.interpreter is not None:
+                predictions = self._predict_tflite(processed_image)
+            else:
+                predictions = self._predict(processed_image).numpy()
             # Декодування передбачень у читабельні мітки (теги)
             decoded_predictions = decode_predictions(predictions, top=top_n)[0]
 
             tags = [label for (imagenet_id, label, score) in decoded_predictions]
-            print(f"Теги для {os.path.basename(image_path)}: {tags}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Теги для %s: %s", os.path.basename(image_path), tags)
+            self._cache_tags([(cache_key, tags)])
             return tags
         except Exception as e:
-            print(f"Помилка під час автоматичного тегування для {image_path}: {e}")
+            logger.error("Помилка під час автоматичного тегування для %s: %s", image_path, e)
             return []
 
-    def extract_text_from_image(self, image_path):
+    @staticmethod
+    def _load_image_tensor(img_path):
+        """
+        Читає, декодує та масштабує зображення всередині конвеєра tf.data
+        і готує його для MobileNetV2. Шлях повертається разом із зображенням,
+        щоб результати зіставлялися зі шляхами навіть після пропуску зіпсованих файлів.
+        """
+        img = tf.io.decode_image(tf.io.read_file(img_path), channels=3, expand_animations=False)
+        img = tf.image.resize(img, (224, 224))
+        return img_path, preprocess_input(img)
+
+    def auto_tag_images(self, image_paths, top_n=5, batch_size=32):
+        """
+        Автоматично тегує кілька зображень пакетами: зображення читаються паралельно через tf.data,
+        а модель обробляє цілий пакет (N, 224, 224, 3) одним викликом скомпільованого графа.
+
+        Аргументи:
+            image_paths (list): Список шляхів до файлів зображень.
+            top_n (int): Кількість найкращих тегів для кожного зображення.
+            batch_size (int): Кількість зображень в одному пакеті.
+
+        Повертає:
+            dict: Словник {шлях: список тегів}. Для зображень, які не вдалося обробити,
+                  повертається порожній список.
+        """
+        results = {img_path: [] for img_path in image_paths}
+        if self.image_tagging_model is None:
+            logger.error("Помилка: Модель тегування зображень не завантажена.")
+            return results
+
+        existing_paths = []
+        cache_keys = {}
+        model_key = self._tag_model_key(batched=True)
+        for img_path in results:
+            cache_key = (self._content_hash(img_path), model_key, top_n)
+            if cache_key[0] is None:
+                logger.error("Помилка: Зображення не знайдено за шляхом: %s", img_path)
+                continue
+            cached_tags = self._get_cached_tags(cache_key)
+            if cached_tags is not None:
+                results[img_path] = cached_tags
+            else:
+                existing_paths.append(img_path)
+                cache_keys[img_path] = cache_key
+        if not existing_paths:
+            return results
+
+        dataset = (
+            tf.data.Dataset.from_tensor_slices(existing_paths)
+            .map(self._load_image_tensor, num_parallel_calls=tf.data.AUTOTUNE)
+            # Файл, який не вдалося прочитати чи декодувати, пропускається, а не зупиняє весь конвеєр
+            .apply(tf.data.experimental.ignore_errors())
+            .batch(batch_size)
+            .prefetch(tf.data.AUTOTUNE)
+        )
+        if self._device != '/CPU:0':
+            # Наступний пакет копіюється на GPU, поки модель обробляє поточний
+            dataset = dataset.apply(tf.data.experimental.prefetch_to_device(self._device))
+        tagged = []
+        try:
+            for batch_paths, batch in dataset:
+                predictions = self._predict(batch).numpy()
+                decoded_batch = decode_predictions(predictions, top=top_n)
+                for img_path, decoded in zip(batch_paths.numpy(), decoded_batch):
+                    img_path = img_path.decode()
+                    results[img_path] = [label for (imagenet_id, label, score) in decoded]
+                    tagged.append((cache_keys.pop(img_path), results[img_path]))
+        except Exception as e:
+            logger.error("Помилка під час пакетного тегування: %s", e)
+        self._cache_tags(tagged)
+        # У cache_keys лишилися лише зображення, які не вдалося прочитати чи протегувати
+        for img_path in cache_keys:
+            logger.error("Помилка: Не вдалося протегувати зображення: %s", img_path)
+        logger.info("Пакетне тегування завершено для %d зображень.", len(existing_paths))
+        return results
+
+    def extract_text_from_image(self, image_path, force=False):
         """
         Витягує текст із зображення за допомогою Tesseract OCR.
+        Зображення без ознак тексту (див. _likely_has_text) пропускаються без запуску Tesseract.
+        Результат кешується за хешем вмісту файлу.
 
         Аргументи:
             image_path (str): Шлях до файлу зображення.
+            force (bool): Виконати OCR без попередньої перевірки (наприклад, для відомих документів).
 
         Повертає:
             str: Витягнутий текст із зображення.
                  Повертає порожній рядок, якщо обробка не вдалася або текст не знайдено.
         """
-        if not os.path.exists(image_path):
-            print(f"Помилка: Зображення не знайдено за шляхом: {image_path}")
+        cache_key = (self._content_hash(image_path), force)
+        cached_text = self._get_cached_ocr(cache_key)
+        if cached_text is not None:
+            return cached_text
+        text = ocr_image_file(image_path, force, self.ocr_lang, self.ocr_config)
+        if text is None:
             return ""
+        self._cache_ocr([(cache_key, text)])
+        return text
+
+    def extract_text_from_images(self, image_paths, max_workers=None, force=False):
+        """
+        Витягує текст із кількох зображень паралельно в пулі процесів (за замовчуванням
+        по одному на ядро). Пул перевикористовується між викликами (див. _get_ocr_executor),
+        а кожен процес завантажує мовну модель Tesseract один раз (через tesserocr, якщо він
+        встановлений) і обробляє зображення частинами по OCR_CHUNK_SIZE.
+        У пул передаються лише зображення, яких немає в кеші.
+
+        Аргументи:
+            image_paths (list): Список шляхів до файлів зображень.
+            max_workers (int): Кількість процесів; None - os.cpu_count().
+            force (bool): Виконати OCR без попередньої перевірки на наявність тексту.
+
+        Повертає:
+            dict: Словник {шлях: витягнутий текст}. Для зображень, які не вдалося обробити,
+                  повертається порожній рядок.
+        """
+        results = {img_path: "" for img_path in image_paths}
+        cache_keys = {img_path: (self._content_hash(img_path), force) for img_path in results}
+        pending_paths = []
+        for img_path, cache_key in cache_keys.items():
+            cached_text = self._get_cached_ocr(cache_key)
+            if cached_text is not None:
+                results[img_path] = cached_text
+            else:
+                pending_paths.append(img_path)
+        if not pending_paths:
+            return results
 
         try:
-            # Завантаження зображення за допомогою OpenCV
-            img = cv2.imread(image_path)
-            if img is None:
-                print(f"Помилка: Не вдалося завантажити зображення за допомогою OpenCV за шляхом: {image_path}")
-                return ""
-
-            # Перетворення в відтінки сірого для кращої точності OCR
-            gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-            # Використання pytesseract для вилучення тексту
-            text = pytesseract.image_to_string(gray_img)
-            # Друк перших 50 символів витягнутого тексту для зручності
-            print(f"Витягнутий текст з {os.path.basename(image_path)}: '{text.strip()[:50]}...'")
-            return text.strip()
-        except pytesseract.TesseractNotFoundError:
-            print("Помилка: Tesseract не встановлено або не знайдено у вашому PATH.")
-            print("Будь ласка, встановіть Tesseract OCR та переконайтеся, що він доступний,")
-            print("або налаштуйте pytesseract.pytesseract.tesseract_cmd.")
-            return ""
+            executor = self._get_ocr_executor(max_workers)
+            texts = list(executor.map(ocr_image_file, pending_paths, repeat(force),
+                                      repeat(self.ocr_lang), repeat(self.ocr_config),
+                                      chunksize=OCR_CHUNK_SIZE))
         except Exception as e:
-            print(f"Помилка під час OCR для {image_path}: {e}")
-            return ""
+            logger.error("Помилка під час паралельного OCR: %s", e)
+            # Пул міг зламатися (наприклад, BrokenProcessPool); наступний виклик створить новий
+            self._shutdown_ocr_executor()
+            return results
+
+        recognized = []
+        for img_path, text in zip(pending_paths, texts):
+            if text is None:
+                continue
+            results[img_path] = text
+            recognized.append((cache_keys[img_path], text))
+        self._cache_ocr(recognized)
+        return results
+
+    def index_metadata(self, image_metadata_list):
+        """
+        Будує сховище метаданих для semantic_search_placeholder у вигляді структури масивів:
+        масив шляхів, плоский буфер тегів у нижньому регістрі зі зсувами (CSR: теги зображення i -
+        записи з _tag_offsets[i] до _tag_offsets[i + 1]) та один буфер текстів OCR зі зсувами.
+        Пошук сканує ці буфери в C (str.find) замість обходу словників для кожного зображення.
+        Сховище будується один раз під час завантаження метаданих і замінює попереднє.
+        Якщо доступна модель вбудовувань, також будується FAISS-індекс для semantic_search.
+
+        Аргументи:
+            image_metadata_list (list): Список словників з 'path', 'tags' та 'ocr_text'
+                                        (формат як у semantic_search_placeholder).
+        """
+        paths = []
+        tag_data = []
+        tag_counts = []
+        ocr_texts = []
+        for metadata in image_metadata_list:
+            paths.append(metadata.get('path'))
+            tags = metadata.get('tags', [])
+            tag_data.extend(tag.lower() for tag in tags)
+            tag_counts.append(len(tags))
+            ocr_texts.append(metadata.get('ocr_text', '').lower())
+
+        self._paths = np.array(paths, dtype=object)
+        self._tag_offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        np.cumsum(tag_counts, out=self._tag_offsets[1:])
+        self._tag_buffer, self._tag_starts = _concat_with_offsets(tag_data)
+        self._ocr_buffer, self._ocr_starts = _concat_with_offsets(ocr_texts)
+
+        if self._get_text_model() is not None:
+            try:
+                self._build_embedding_index(image_metadata_list)
+            except Exception as e:
+                logger.error("Помилка побудови індексу вбудовувань: %s", e)
+                self._embedding_index = None
+
+        logger.info("Проіндексовано %d зображень.", len(self._paths))
+
+    def _search_index(self, query_lower):
+        """
+        Шукає у сховищі з index_metadata з тією ж семантикою, що й перебір у
+        semantic_search_placeholder: слово запиту є підрядком тегу або весь запит є підрядком тексту OCR.
+        """
+        matches = set()
+        for query_word in query_lower.split():
+            tag_records = _find_records(self._tag_buffer, self._tag_starts, query_word)
+            if tag_records:
+                # Номер тегу в плоскому буфері -> номер зображення за зсувами CSR
+                matches.update(np.searchsorted(self._tag_offsets, tag_records, side='right') - 1)
+        matches.update(_find_records(self._ocr_buffer, self._ocr_starts, query_lower))
+
+        # Порядок результатів - порядок метаданих; повторювані шляхи повертаються один раз
+        return list(dict.fromkeys(self._paths[sorted(int(i) for i in matches)]))
+
+    def _get_text_model(self):
+        """
+        Завантажує модель вбудовувань під час першого звернення, а не в конструкторі: уперше модель
+        завантажується з мережі, а процесору лише для тегування чи OCR вона не потрібна.
+        Невдала спроба не повторюється.
+
+        Повертає:
+            SentenceTransformer: Модель або None, якщо sentence-transformers не встановлено чи завантаження не вдалося.
+        """
+        if not self._text_model_loaded and SentenceTransformer is not None:
+            self._text_model_loaded = True
+            try:
+                self.text_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                logger.info("Модель вбудовувань %s успішно завантажена.", EMBEDDING_MODEL_NAME)
+            except Exception as e:
+                logger.error("Помилка завантаження моделі вбудовувань: %s. Семантичний пошук виконуватиметься за ключовими словами.", e)
+        return self.text_model
+
+    def _build_embedding_index(self, image_metadata_list):
+        """
+        Будує FAISS-індекс вбудовувань опису кожного зображення (теги + текст OCR).
+        Вектори нормалізуються, тож скалярний добуток дорівнює косинусній подібності.
+        До EMBEDDING_IVFPQ_THRESHOLD векторів використовується HNSW, для більших бібліотек -
+        IVFPQ, що стискає вектори та потребує навчання на самих даних.
+        """
+        paths = list(dict.fromkeys(metadata.get('path') for metadata in image_metadata_list))
+        descriptions = {}
+        for metadata in image_metadata_list:
+            descriptions[metadata.get('path')] = " ".join(metadata.get('tags', [])) + ". " + metadata.get('ocr_text', '')
+        if not paths:
+            self._embedding_index = None
+            self._embedding_paths = []
+            return
+
+        embeddings = self.text_model.encode([descriptions[path] for path in paths],
+                                            normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+        dimension = embeddings.shape[1]
+        if len(paths) >= EMBEDDING_IVFPQ_THRESHOLD:
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFPQ(quantizer, dimension, EMBEDDING_IVF_NLIST, EMBEDDING_PQ_M, 8,
+                                     faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+            index.nprobe = EMBEDDING_IVF_NPROBE
+        else:
+            index = faiss.IndexHNSWFlat(dimension, EMBEDDING_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = EMBEDDING_HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = EMBEDDING_HNSW_EF_SEARCH
+        index.add(embeddings)
+        self._embedding_index = index
+        self._embedding_paths = paths
+
+    def semantic_search(self, query, top_k=10):
+        """
+        Семантичний пошук за вбудовуваннями: запит і описи зображень (теги + текст OCR)
+        порівнюються за косинусною подібністю у FAISS-індексі, побудованому index_metadata.
+        Якщо faiss або sentence-transformers не встановлені, виконується пошук за ключовими словами.
 
-    def semantic_search_placeholder(self, query, image_metadata_list):
+        Аргументи:
+            query (str): Пошуковий запит (наприклад, "кіт грає в парку").
+            top_k (int): Максимальна кількість результатів.
+
+        Повертає:
+            list: Список шляхів до зображень, від найбільш до найменш подібного.
+        """
+        if self._embedding_index is None:
+            return self.semantic_search_placeholder(query)
+
+        logger.debug("Виконання семантичного пошуку за запитом: '%s'", query)
+        query_embedding = self.text_model.encode([query], normalize_embeddings=True,
+                                                 convert_to_numpy=True).astype(np.float32)
+        _, indices = self._embedding_index.search(query_embedding, min(top_k, len(self._embedding_paths)))
+        matching_images = [self._embedding_paths[i] for i in indices[0] if i != -1]
+        logger.debug("Знайдено %d відповідних зображень.", len(matching_images))
+        return matching_images
+
+    def semantic_search_placeholder(self, query, image_metadata_list=None):
         """
         Заповнювач для функціональності семантичного пошуку.
         У реальному застосунку це включатиме:
@@ -122,38 +858,50 @@ class PhotoAINavigatorProcessor:
         4. Виконання пошуку за схожістю.
 
         Для цього прикладу виконується простий пошук за ключовими словами в тегах та тексті OCR.
+        Без image_metadata_list пошук виконується у сховищі, побудованому index_metadata.
 
         Аргументи:
             query (str): Пошуковий запит (наприклад, "кіт грає в парку").
-            image_metadata_list (list): Список словників, де кожен словник містить
+            image_metadata_list (list): Необов'язковий список словників, де кожен словник містить
                                         'path', 'tags' та 'ocr_text' для зображення.
                                         Приклад: [{'path': 'img1.jpg', 'tags': ['кіт', 'парк'], 'ocr_text': 'Ласкаво просимо до парку'}]
 
         Повертає:
             list: Список шляхів до зображень, які відповідають запиту.
         """
-        print(f"Виконання базового семантичного пошуку за запитом: '{query}'")
+        logger.debug("Виконання базового семантичного пошуку за запитом: '%s'", query)
         query_lower = query.lower()
-        matching_images = []
+        if image_metadata_list is None:
+            matching_images = self._search_index(query_lower)
+            logger.debug("Знайдено %d відповідних зображень.", len(matching_images))
+            return matching_images
+
+        # Слова запиту компілюються в один регулярний вираз, який перевіряє всі теги зображення
+        # одним проходом. Слова не містять пробільних символів, тож збіг не перетинає межу тегів.
+        query_words = query_lower.split()
+        tag_pattern = re.compile("|".join(map(re.escape, query_words))) if query_words else None
 
+        matching_images = []
         for metadata in image_metadata_list:
             image_path = metadata.get('path')
             tags = metadata.get('tags', [])
             ocr_text = metadata.get('ocr_text', '')
 
-            # Перевірка, чи слова запиту є в тегах або тексті OCR
+            # Перевірка, чи слова запиту є в тегах або весь запит - у тексті OCR
             # Це дуже просте зіставлення ключових слів, а не справжній семантичний пошук
-            found_in_tags = any(query_word in tag.lower() for query_word in query_lower.split() for tag in tags)
+            found_in_tags = tag_pattern is not None and tag_pattern.search("\n".join(tags).lower()) is not None
             found_in_ocr = query_lower in ocr_text.lower()
 
             if found_in_tags or found_in_ocr:
                 matching_images.append(image_path)
 
-        print(f"Знайдено {len(matching_images)} відповідних зображень.")
+        logger.debug("Знайдено %d відповідних зображень.", len(matching_images))
         return matching_images
 
 # --- ПРИКЛАД ВИКОРИСТАННЯ ---
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+
     # Створення фіктивного зображення для тестування, якщо воно не існує.
     # У реальному застосунку ви б замінили це на фактичні шляхи до зображень.
     dummy_image_path = "test_image_photoai.jpg"
@@ -175,18 +923,15 @@ if __name__ == "__main__":
     if dummy_image_path:
         processor = PhotoAINavigatorProcessor()
 
-        print("
---- Тестування автоматичного тегування ---")
+        print("\n--- Тестування автоматичного тегування ---")
         tags = processor.auto_tag_image(dummy_image_path)
         print(f"Згенеровані теги: {tags}")
 
-        print("
---- Тестування OCR ---")
+        print("\n--- Тестування OCR ---")
         extracted_text = processor.extract_text_from_image(dummy_image_path)
         print(f"Витягнутий текст: '{extracted_text}'")
 
-        print("
---- Тестування заповнювача семантичного пошуку ---")
+        print("\n--- Тестування заповнювача семантичного пошуку ---")
         # Імітація деяких метаданих зображень, які зберігалися б у SQLite
         # У реальному сценарії вони надходили б із запиту до бази даних
         sample_image_metadata = [
@@ -195,19 +940,26 @@ if __name__ == "__main__":
             {'path': 'birthday_party.png', 'tags': ['день народження', 'вечірка', 'торт'], 'ocr_text': 'З Днем Народження!'},
             {'path': 'park_scene.jpeg', 'tags': ['парк', 'дерево', 'природа'], 'ocr_text': 'Прекрасний день у парку'}
         ]
+        # Сховище для пошуку будується один раз, а запити нижче виконуються за ним
+        processor.index_metadata(sample_image_metadata)
 
-        search_results_cat = processor.semantic_search_placeholder("кіт грає", sample_image_metadata)
+        search_results_cat = processor.semantic_search_placeholder("кіт грає")
         print(f"Результати пошуку за 'кіт грає': {search_results_cat}")
 
-        search_results_park = processor.semantic_search_placeholder("парк", sample_image_metadata)
+        search_results_park = processor.semantic_search_placeholder("парк")
         print(f"Результати пошуку за 'парк': {search_results_park}")
 
-        search_results_birthday = processor.semantic_search_placeholder("мій день народження", sample_image_metadata)
+        search_results_birthday = processor.semantic_search_placeholder("мій день народження")
         print(f"Результати пошуку за 'мій день народження': {search_results_birthday}")
 
-        search_results_hello = processor.semantic_search_placeholder("Hello Navigator", sample_image_metadata)
+        search_results_hello = processor.semantic_search_placeholder("Hello Navigator")
         print(f"Результати пошуку за 'Hello Navigator': {search_results_hello}")
 
+        print("\n--- Тестування семантичного пошуку за вбудовуваннями ---")
+        search_results_semantic = processor.semantic_search("кошеня в саду", top_k=2)
+        print(f"Результати пошуку за 'кошеня в саду': {search_results_semantic}")
+
+        processor.close()
+
     else:
-        print("
-Приклад використання пропущено, оскільки фіктивне зображення не вдалося створити.")
+        print("\nПриклад використання пропущено, оскільки фіктивне зображення не вдалося створити.")
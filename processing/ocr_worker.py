@@ -0,0 +1,130 @@
+"""
+OCR зображень через Tesseract для PhotoAI Navigator.
+
+Модуль навмисно не залежить від TensorFlow та моделей вбудовувань: його функції виконуються
+в процесах-воркерах пулу OCR (див. PhotoAINavigatorProcessor.extract_text_from_images), які
+запускаються методом spawn і імпортують лише цей модуль.
+"""
+import os
+import logging
+import shlex
+
+import numpy as np
+import cv2
+import pytesseract
+
+try:
+    # tesserocr викликає libtesseract напряму і тримає мовну модель завантаженою між викликами;
+    # без нього OCR виконується через pytesseract (новий процес tesseract на кожне зображення)
+    from tesserocr import PyTessBaseAPI
+except ImportError:
+    PyTessBaseAPI = None
+
+logger = logging.getLogger(__name__)
+
+# --- КОНФІГУРАЦІЯ PYTESSERACT ---
+# ВАЖЛИВО: Замініть 'path/to/tesseract' на фактичний шлях до вашого виконуваного файлу Tesseract OCR.
+# Для Windows це може бути щось на зразок r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Для Linux/macOS він зазвичай знаходиться в PATH, але якщо ні, вкажіть його тут.
+# pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+# --- КОНФІГУРАЦІЯ OCR ---
+OCR_LANG = 'eng'
+# Режим двигуна (1 - лише LSTM, без застарілого двигуна) та режим сегментації сторінки
+# (6 - один блок тексту, без повного аналізу макета) Tesseract
+OCR_OEM = 1
+OCR_PSM = 6
+# Максимальна довжина довшої сторони зображення для OCR. Більші зображення зменшуються:
+# час роботи Tesseract зростає з кількістю пікселів, а точність вище ~300 DPI не покращується.
+OCR_MAX_LONG_EDGE = 1800
+# Мінімальна частка пікселів-контурів (Canny), за якої зображення передається в Tesseract.
+# Поріг навмисно низький: пропущене фото без тексту коштує лише часу, а пропущений текст - результату.
+OCR_MIN_EDGE_DENSITY = 0.005
+
+# Екземпляр PyTessBaseAPI поточного процесу-воркера OCR (див. init_ocr_worker).
+# У головному процесі він не створюється, і OCR виконується через pytesseract.
+_ocr_api = None
+
+def tesseract_config(oem, psm, char_whitelist=None):
+    """Формує рядок параметрів командного рядка Tesseract для pytesseract."""
+    config = f"--oem {oem} --psm {psm}"
+    if char_whitelist:
+        config += f" -c tessedit_char_whitelist={shlex.quote(char_whitelist)}"
+    return config
+
+def init_ocr_worker(lang, oem=OCR_OEM, psm=OCR_PSM, char_whitelist=None):
+    """Ініціалізатор процесу-воркера: завантажує мовну модель Tesseract один раз на процес."""
+    global _ocr_api
+    if PyTessBaseAPI is not None:
+        _ocr_api = PyTessBaseAPI(lang=lang, psm=psm, oem=oem)
+        if char_whitelist:
+            _ocr_api.SetVariable("tessedit_char_whitelist", char_whitelist)
+        # Перше розпізнавання ініціалізує внутрішні структури Tesseract; виконуємо його на порожньому зображенні
+        blank = np.full((32, 32), 255, dtype=np.uint8)
+        _ocr_api.SetImageBytes(blank.tobytes(), 32, 32, 1, 32)
+        _ocr_api.GetUTF8Text()
+
+def _likely_has_text(gray_img):
+    """
+    Швидка перевірка (кілька мс) перед OCR: текст дає багато різких контурів,
+    тож зображення з низькою щільністю контурів Canny вважається таким, що не містить тексту.
+    """
+    edges = cv2.Canny(gray_img, 100, 200)
+    return np.count_nonzero(edges) / edges.size >= OCR_MIN_EDGE_DENSITY
+
+def ocr_image_file(image_path, force=False, lang=OCR_LANG, config=None):
+    """
+    Витягує текст із файлу зображення. Використовує PyTessBaseAPI процесу-воркера,
+    якщо він є (налаштований у init_ocr_worker), інакше - pytesseract.
+
+    Аргументи:
+        image_path (str): Шлях до файлу зображення.
+        force (bool): Виконати OCR, навіть якщо попередня перевірка не знайшла ознак тексту.
+        lang (str): Мова (мови) Tesseract для pytesseract.
+        config (str): Параметри Tesseract для pytesseract (див. tesseract_config);
+                      None - OCR_OEM та OCR_PSM.
+
+    Повертає:
+        str: Витягнутий текст (порожній, якщо тексту немає) або None, якщо обробка не вдалася.
+    """
+    try:
+        # Зображення декодується одразу у відтінки сірого (для кращої точності OCR):
+        # декодер видає лише яскравість, без проміжного BGR-зображення та cvtColor
+        gray_img = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray_img is None:
+            logger.error("Помилка: Не вдалося завантажити зображення за допомогою OpenCV за шляхом: %s", image_path)
+            return None
+
+        height, width = gray_img.shape
+        scale = OCR_MAX_LONG_EDGE / max(height, width)
+        if scale < 1.0:
+            gray_img = cv2.resize(gray_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        if not force and not _likely_has_text(gray_img):
+            logger.debug("OCR пропущено для %s: ознак тексту не знайдено.", os.path.basename(image_path))
+            return ""
+
+        if _ocr_api is not None:
+            height, width = gray_img.shape
+            _ocr_api.SetImageBytes(gray_img.tobytes(), width, height, 1, width)
+            text = _ocr_api.GetUTF8Text()
+        else:
+            # Використання pytesseract для вилучення тексту
+            if config is None:
+                config = tesseract_config(OCR_OEM, OCR_PSM)
+            text = pytesseract.image_to_string(gray_img, lang=lang, config=config)
+        # Журналювання перших 50 символів витягнутого тексту для зручності
+        logger.debug("Витягнутий текст з %s: '%s...'", os.path.basename(image_path), text.strip()[:50])
+        return text.strip()
+    except pytesseract.TesseractNotFoundError:
+        # Обробляється до FileNotFoundError: TesseractNotFoundError теж є підкласом OSError
+        logger.error("Помилка: Tesseract не встановлено або не знайдено у вашому PATH. "
+                     "Будь ласка, встановіть Tesseract OCR та переконайтеся, що він доступний, "
+                     "або налаштуйте pytesseract.pytesseract.tesseract_cmd.")
+        return None
+    except FileNotFoundError:
+        logger.error("Помилка: Зображення не знайдено за шляхом: %s", image_path)
+        return None
+    except Exception as e:
+        logger.error("Помилка під час OCR для %s: %s", image_path, e)
+        return None
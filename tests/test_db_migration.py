@@ -0,0 +1,169 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from database.db import DatabaseManager
+
+# Схема та дані API до переходу на DatabaseManager: текстові camera_model/location і JSON-список тегів
+BASELINE_SCHEMA = '''
+    CREATE TABLE photos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL UNIQUE,
+        filename TEXT NOT NULL,
+        date_taken TEXT,
+        location TEXT,
+        camera_model TEXT,
+        tags TEXT
+    );
+'''
+
+# Нормалізована схема API: довідники камер і місць та теги в photo_tags
+NORMALIZED_SCHEMA = '''
+    CREATE TABLE cameras (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+    CREATE TABLE locations (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+    CREATE TABLE photos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL UNIQUE,
+        filename TEXT NOT NULL,
+        date_taken TEXT,
+        location_id INTEGER REFERENCES locations(id),
+        camera_id INTEGER REFERENCES cameras(id)
+    );
+    CREATE TABLE tags (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+    CREATE TABLE photo_tags (
+        photo_id INTEGER,
+        tag_id INTEGER,
+        PRIMARY KEY (photo_id, tag_id)
+    );
+'''
+
+# Схема DatabaseManager до появи довідників: текстові camera_model/location в images та FTS5-індекс над ними
+TEXT_IMAGES_SCHEMA = '''
+    CREATE TABLE images (
+        id INTEGER PRIMARY KEY,
+        file_path TEXT UNIQUE NOT NULL,
+        capture_date TEXT,
+        camera_model TEXT,
+        location TEXT,
+        latitude REAL,
+        longitude REAL
+    );
+    CREATE INDEX idx_images_camera_model ON images(camera_model);
+    CREATE TABLE tags (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+    CREATE TABLE image_tags (image_id INTEGER, tag_id INTEGER, PRIMARY KEY (image_id, tag_id));
+    CREATE VIRTUAL TABLE images_fts USING fts5(
+        camera_model, location, content='images', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER images_fts_ai AFTER INSERT ON images BEGIN
+        INSERT INTO images_fts (rowid, camera_model, location) VALUES (new.id, new.camera_model, new.location);
+    END;
+'''
+
+SAMPLE_PHOTOS = [
+    ("C:/photos/vacation/beach.jpg", "2023-07-15 10:30:00", "Пляж", "Canon EOS R5", ["відпустка", "пляж", "літо"]),
+    ("C:/photos/city/skyline.png", "2023-01-20 18:00:00", "Центр міста", "Sony Alpha 7 III", ["місто", "ніч"]),
+    ("C:/photos/nature/mountain.jpeg", "2022-09-01 08:00:00", None, None, []),
+]
+
+class PhotosMigrationTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.addCleanup(self._remove_db_files)
+
+    def _remove_db_files(self):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def _create_baseline_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript(BASELINE_SCHEMA)
+            conn.executemany(
+                'INSERT INTO photos (path, filename, date_taken, location, camera_model, tags) VALUES (?, ?, ?, ?, ?, ?)',
+                [(path, os.path.basename(path), date_taken, location, camera_model, json.dumps(tags))
+                 for path, date_taken, location, camera_model, tags in SAMPLE_PHOTOS]
+            )
+        conn.close()
+
+    def _create_normalized_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript(NORMALIZED_SCHEMA)
+            for path, date_taken, location, camera_model, tags in SAMPLE_PHOTOS:
+                camera_id = location_id = None
+                if camera_model:
+                    conn.execute('INSERT OR IGNORE INTO cameras (name) VALUES (?)', (camera_model,))
+                    camera_id = conn.execute('SELECT id FROM cameras WHERE name = ?', (camera_model,)).fetchone()[0]
+                if location:
+                    conn.execute('INSERT OR IGNORE INTO locations (name) VALUES (?)', (location,))
+                    location_id = conn.execute('SELECT id FROM locations WHERE name = ?', (location,)).fetchone()[0]
+                photo_id = conn.execute(
+                    'INSERT INTO photos (path, filename, date_taken, location_id, camera_id) VALUES (?, ?, ?, ?, ?)',
+                    (path, os.path.basename(path), date_taken, location_id, camera_id)
+                ).lastrowid
+                conn.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)', [(tag,) for tag in tags])
+                conn.executemany(
+                    'INSERT INTO photo_tags (photo_id, tag_id) SELECT ?, id FROM tags WHERE name = ?',
+                    [(photo_id, tag) for tag in tags]
+                )
+        conn.close()
+
+    def _create_text_images_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript(TEXT_IMAGES_SCHEMA)
+            for path, date_taken, location, camera_model, tags in SAMPLE_PHOTOS:
+                image_id = conn.execute(
+                    'INSERT INTO images (file_path, capture_date, camera_model, location) VALUES (?, ?, ?, ?)',
+                    (path, date_taken, camera_model, location)
+                ).lastrowid
+                conn.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)', [(tag,) for tag in tags])
+                conn.executemany(
+                    'INSERT INTO image_tags (image_id, tag_id) SELECT ?, id FROM tags WHERE name = ?',
+                    [(image_id, tag) for tag in tags]
+                )
+        conn.close()
+
+    def _assert_migrated(self):
+        with DatabaseManager(self.db_path) as db:
+            images = {image['file_path']: image for image in db.search_images()}
+            self.assertEqual(set(images), {photo[0] for photo in SAMPLE_PHOTOS})
+            tags_by_image = db.get_tags_for_images([image['id'] for image in images.values()])
+            for path, date_taken, location, camera_model, tags in SAMPLE_PHOTOS:
+                image = images[path]
+                self.assertEqual(image['capture_date'], date_taken)
+                self.assertEqual(image['location'], location)
+                self.assertEqual(image['camera_model'], camera_model)
+                self.assertEqual(tags_by_image.get(image['id'], []), sorted(tags))
+
+            self.assertEqual([image['file_path'] for image in db.search_images(location='міста')],
+                             ["C:/photos/city/skyline.png"])
+            self.assertEqual([image['file_path'] for image in db.search_images(camera_model='EOS')],
+                             ["C:/photos/vacation/beach.jpg"])
+            self.assertEqual([image['file_path'] for image in db.search_images(camera_model='7')],
+                             ["C:/photos/city/skyline.png"])
+            self.assertEqual([image['file_path'] for image in db.search_images(tag_names=['пляж', 'літо'])],
+                             ["C:/photos/vacation/beach.jpg"])
+
+            db.cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('photos', 'photo_tags', 'images_fts')")
+            self.assertEqual(db.cursor.fetchall(), [])
+            self.assertEqual(db._table_columns('images'),
+                             {'id', 'file_path', 'capture_date', 'camera_id', 'location_id', 'latitude', 'longitude'})
+            db.cursor.execute('SELECT name FROM cameras ORDER BY name')
+            self.assertEqual([row['name'] for row in db.cursor.fetchall()], ["Canon EOS R5", "Sony Alpha 7 III"])
+
+    def test_migrates_baseline_photos_schema(self):
+        self._create_baseline_db()
+        self._assert_migrated()
+
+    def test_migrates_normalized_photos_schema(self):
+        self._create_normalized_db()
+        self._assert_migrated()
+
+    def test_migrates_text_columns_of_images(self):
+        self._create_text_images_db()
+        self._assert_migrated()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+try:
+    from processing import image_processor
+except ImportError:  # TensorFlow, OpenCV або pytesseract не встановлені
+    image_processor = None
+
+# Метадані з перетином тегів і тексту OCR та порожніми полями
+SAMPLE_METADATA = [
+    {'path': 'beach.jpg', 'tags': ['Пляж', 'море', 'sunset'], 'ocr_text': 'Welcome to the Park'},
+    {'path': 'city.jpg', 'tags': ['місто', 'ніч'], 'ocr_text': ''},
+    {'path': 'park.jpg', 'tags': ['park', 'кіт'], 'ocr_text': 'День народження кота'},
+    {'path': 'empty.jpg', 'tags': [], 'ocr_text': ''},
+    {'path': 'lake.jpg', 'tags': ['літо'], 'ocr_text': 'hello navigator'},
+]
+
+SAMPLE_QUERIES = ['', ' ', 'park', 'PARK', 'море ніч', 'кі', 'welcome to the park', 'день народження',
+                  'hello navigator', 'navigator hello', 'sun', 'x']
+
+def _fake_decode_predictions(predictions, top):
+    """Замінює decode_predictions ImageNet: top міток для кожного рядка передбачень."""
+    return [[(f'n{i}', f'tag{i}', 1.0) for i in range(top)] for _ in predictions]
+
+@unittest.skipIf(image_processor is None, 'потрібні TensorFlow, OpenCV та pytesseract')
+class ImageProcessorCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.image_path = self._write_file('image.jpg', b'first version')
+
+    def _write_file(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def _make_processor(self, cache_path=None):
+        # Без завантаження ваг MobileNetV2: процесор працює як без моделі тегування
+        with mock.patch.object(image_processor.PhotoAINavigatorProcessor, '_build_tagging_model',
+                               side_effect=RuntimeError('модель не завантажується в тестах')), \
+                self.assertLogs('processing.image_processor', level='ERROR'):
+            processor = image_processor.PhotoAINavigatorProcessor(cache_path=cache_path)
+        self.addCleanup(processor.close)
+        return processor
+
+    def _enable_fake_model(self, processor):
+        """Підставляє модель Keras, передбачення якої лише рахуються."""
+        processor.image_tagging_model = object()
+        processor._predict = mock.Mock(return_value=mock.Mock(numpy=lambda: np.zeros((1, 1000), np.float32)))
+        preprocess = mock.patch.object(processor, '_preprocess_image_for_model',
+                                       return_value=np.zeros((1, 224, 224, 3), np.float32))
+        decode = mock.patch.object(image_processor, 'decode_predictions', _fake_decode_predictions)
+        preprocess.start()
+        decode.start()
+        self.addCleanup(preprocess.stop)
+        self.addCleanup(decode.stop)
+
+    def test_tag_cache_is_keyed_by_model_and_preprocessing(self):
+        processor = self._make_processor()
+        self._enable_fake_model(processor)
+
+        tags = processor.auto_tag_image(self.image_path, top_n=3)
+        self.assertEqual(tags, ['tag0', 'tag1', 'tag2'])
+        self.assertEqual(processor.auto_tag_image(self.image_path, top_n=3), tags)
+        self.assertEqual(processor._predict.call_count, 1)
+
+        # Пакетний шлях масштабує зображення інакше, тож теги з auto_tag_image йому не повертаються
+        content_hash = processor._content_hash(self.image_path)
+        self.assertNotEqual(processor._tag_model_key(), processor._tag_model_key(batched=True))
+        self.assertIsNone(processor._get_cached_tags((content_hash, processor._tag_model_key(batched=True), 3)))
+
+        # Інша точність моделі - інший ключ і повторне передбачення
+        processor.use_fp16 = True
+        processor.auto_tag_image(self.image_path, top_n=3)
+        self.assertEqual(processor._predict.call_count, 2)
+
+        processor.interpreter = object()
+        processor._tflite_mode = 'int8'
+        self.assertEqual(processor._tag_model_key(), 'tflite-int8/opencv-area')
+
+    def test_changed_file_is_rehashed_and_results_survive_restart(self):
+        cache_path = os.path.join(self.tmp_dir.name, 'cache.db')
+
+        def read_text(image_path, force, lang, config):
+            with open(image_path, 'rb') as f:
+                return f.read().decode()
+
+        with mock.patch.object(image_processor, 'ocr_image_file', side_effect=read_text) as ocr:
+            processor = self._make_processor(cache_path)
+            first_hash = processor._content_hash(self.image_path)
+            self.assertEqual(processor.extract_text_from_image(self.image_path), 'first version')
+            processor.close()
+
+            # Новий процесор бере текст і хеш з файлу кешу, не запускаючи OCR
+            processor = self._make_processor(cache_path)
+            self.assertEqual(processor.extract_text_from_image(self.image_path), 'first version')
+            self.assertEqual(ocr.call_count, 1)
+
+            self._write_file('image.jpg', b'second version')
+            stat = os.stat(self.image_path)
+            os.utime(self.image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            self.assertNotEqual(processor._content_hash(self.image_path), first_hash)
+            self.assertEqual(processor.extract_text_from_image(self.image_path), 'second version')
+            self.assertEqual(ocr.call_count, 2)
+
+    def test_cache_read_error_is_a_miss(self):
+        processor = self._make_processor(os.path.join(self.tmp_dir.name, 'cache.db'))
+        processor._store.close()
+        with self.assertLogs('processing.image_processor', level='WARNING'):
+            self.assertIsNone(processor._get_cached_tags(('hash', processor._tag_model_key(), 5)))
+            self.assertIsNotNone(processor._content_hash(self.image_path))
+
+    def test_search_index_matches_metadata_scan(self):
+        processor = self._make_processor()
+        processor.index_metadata(SAMPLE_METADATA)
+        for query in SAMPLE_QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(processor.semantic_search_placeholder(query),
+                                 processor.semantic_search_placeholder(query, SAMPLE_METADATA))
+        self.assertEqual(processor.semantic_search_placeholder('park'), ['beach.jpg', 'park.jpg'])
+
+if __name__ == '__main__':
+    unittest.main()
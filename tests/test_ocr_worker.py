@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+try:
+    import cv2
+    from processing import ocr_worker
+except ImportError:  # OpenCV або pytesseract не встановлені
+    ocr_worker = None
+
+@unittest.skipIf(ocr_worker is None, 'потрібні OpenCV та pytesseract')
+class OcrImageFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        # OCR у головному процесі йде через pytesseract; Tesseract у тестах не запускається
+        patcher = mock.patch.object(ocr_worker.pytesseract, 'image_to_string', return_value=' recognized text \n')
+        self.image_to_string = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write_image(self, name, img):
+        path = os.path.join(self.tmp_dir.name, name)
+        self.assertTrue(cv2.imwrite(path, img))
+        return path
+
+    def _text_like_image(self, height, width):
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 2, size=(height, width), dtype=np.uint8) * 255
+
+    def test_blank_image_skips_tesseract(self):
+        path = self._write_image('blank.png', np.full((200, 300), 255, dtype=np.uint8))
+        self.assertEqual(ocr_worker.ocr_image_file(path), '')
+        self.image_to_string.assert_not_called()
+
+    def test_force_runs_tesseract_on_blank_image(self):
+        path = self._write_image('blank.png', np.full((200, 300), 255, dtype=np.uint8))
+        self.assertEqual(ocr_worker.ocr_image_file(path, force=True), 'recognized text')
+        self.image_to_string.assert_called_once()
+
+    def test_large_image_is_downscaled_before_ocr(self):
+        path = self._write_image('wide.png', self._text_like_image(400, 4 * ocr_worker.OCR_MAX_LONG_EDGE))
+        self.assertEqual(ocr_worker.ocr_image_file(path), 'recognized text')
+        gray_img = self.image_to_string.call_args.args[0]
+        self.assertEqual(max(gray_img.shape), ocr_worker.OCR_MAX_LONG_EDGE)
+        self.assertEqual(gray_img.shape[0], 100)
+
+    def test_unreadable_file_returns_none(self):
+        path = os.path.join(self.tmp_dir.name, 'broken.png')
+        with open(path, 'wb') as f:
+            f.write(b'not an image')
+        with self.assertLogs('processing.ocr_worker', level='ERROR'):
+            self.assertIsNone(ocr_worker.ocr_image_file(path))
+        with self.assertLogs('processing.ocr_worker', level='ERROR'):
+            self.assertIsNone(ocr_worker.ocr_image_file(os.path.join(self.tmp_dir.name, 'missing.png')))
+
+if __name__ == '__main__':
+    unittest.main()